@@ -1,15 +1,144 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, stream_with_context
 from flask_cors import CORS  # Import CORS
 from models.symptom_checker import SymptomChecker
+from models.conversation_log import ConversationLog
+from models.serialization import PayloadEncoder
+from models.admission_control import AdmissionController
+from models.session_stats import collect_session_stats, tracemalloc_breakdown
+from functools import wraps
+import atexit
+import hmac
 import os
+import signal
+import sys
+import tracemalloc
+
+# Start allocation tracing early so the admin session stats can attribute memory
+if os.environ.get('TRACEMALLOC', '0') == '1':
+    tracemalloc.start()
 
 app = Flask(__name__)
 
 # Enable CORS for requests from localhost:8081
 CORS(app, resources={r"/*": {"origins": "http://192.168.35.185:8081"}})
 
+# Write-behind conversation log (set CONVERSATION_LOG_PATH='' to disable)
+conversation_log_path = os.environ.get('CONVERSATION_LOG_PATH', 'logs/conversations.jsonl')
+conversation_log = ConversationLog(conversation_log_path) if conversation_log_path else None
+if conversation_log is not None:
+    atexit.register(conversation_log.close)
+
 # Initialize the symptom checker
-symptom_checker = SymptomChecker(model_dir='models')
+symptom_checker = SymptomChecker(
+    model_dir='models',
+    conversation_log=conversation_log,
+    max_history=int(os.environ.get('SESSION_HISTORY_LIMIT', 20)),
+    compact_vectorizer=os.environ.get('COMPACT_VECTORIZER', '0') == '1',
+    node_id=os.environ.get('NODE_ID') or None,
+    anytime_inference=os.environ.get('ANYTIME_INFERENCE', '0') == '1'
+)
+
+# Condition responses and precautions are re-sent on every turn, so encode them once
+payload_encoder = PayloadEncoder(
+    list(symptom_checker.responses.values()) + list(symptom_checker.precautions.values()),
+    min_compress_size=int(os.environ.get('COMPRESS_MIN_SIZE', 512))
+)
+
+# Admission control for inference routes (0 disables a limit)
+admission = AdmissionController(
+    rate=float(os.environ.get('RATE_LIMIT_PER_SECOND', 5)),
+    burst=int(os.environ.get('RATE_LIMIT_BURST', 10)),
+    max_inflight=int(os.environ.get('MAX_INFLIGHT_REQUESTS', 8))
+)
+
+def json_response(payload, status=200):
+    """
+    Serialize a payload and compress it if the client accepts gzip or brotli
+    """
+    body = payload_encoder.encode(payload)
+    body, encoding = payload_encoder.compress(body, request.headers.get('Accept-Encoding'))
+    
+    response = Response(body, status=status, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def admission_controlled(view):
+    """
+    Shed load with 429/503 and Retry-After before a request reaches the model
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        rejection = admission.admit(request.remote_addr or 'unknown')
+        if rejection is not None:
+            response = json_response({
+                'status': 'error',
+                'message': rejection['message']
+            }, rejection['status_code'])
+            response.headers['Retry-After'] = str(rejection['retry_after'])
+            return response
+        
+        try:
+            response = view(*args, **kwargs)
+        except Exception:
+            admission.release()
+            raise
+        
+        # Streaming responses run inference after the view returns
+        if isinstance(response, Response) and response.is_streamed:
+            response.call_on_close(admission.release)
+        else:
+            admission.release()
+        return response
+    
+    return wrapper
+
+def admin_required(view):
+    """
+    Require the ADMIN_API_TOKEN in the X-Admin-Token header; disabled when no token is set
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = os.environ.get('ADMIN_API_TOKEN', '')
+        provided = request.headers.get('X-Admin-Token', '')
+        
+        if not expected or not hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8')):
+            return json_response({
+                'status': 'error',
+                'message': 'Admin access required'
+            }, 403)
+        
+        return view(*args, **kwargs)
+    
+    return wrapper
+
+def sse_event(event, data):
+    """
+    Format a Server-Sent Events message with a JSON payload
+    """
+    return b'event: ' + event.encode('utf-8') + b'\ndata: ' + payload_encoder.encode(data) + b'\n\n'
+
+def chat_events(session_id, message):
+    """
+    Yield a chat turn as separate events: acknowledgement, condition, then the long texts
+    """
+    yield sse_event('ack', {'status': 'received', 'session_id': session_id})
+    
+    # Same code path as /api/chat, so session context and history are updated identically
+    result = symptom_checker.process_message(session_id, message)
+    
+    if result.get('status') not in ('success', 'needs_more_info') or result.get('is_conversation'):
+        # Conversational replies, errors and "no condition" are short; send them whole
+        yield sse_event('reply', result)
+    else:
+        summary = {key: value for key, value in result.items() if key not in ('response', 'precaution')}
+        yield sse_event('condition', summary)
+        yield sse_event('response', {'response': result.get('response', '')})
+        if 'precaution' in result:
+            yield sse_event('precaution', {'precaution': result['precaution']})
+    
+    yield sse_event('done', {'status': result.get('status')})
 
 @app.route('/api/start_session', methods=['POST'])
 def start_session():
@@ -18,14 +147,15 @@ def start_session():
     """
     try:
         result = symptom_checker.start_session()
-        return jsonify(result)
+        return json_response(result)
     except Exception as e:
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': f'Error starting session: {str(e)}'
-        }), 500
+        }, 500)
 
 @app.route('/api/chat', methods=['POST'])
+@admission_controlled
 def chat():
     """
     Process a message in a symptom checker session
@@ -34,28 +164,63 @@ def chat():
         data = request.json
         
         if not data:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'No data provided'
-            }), 400
+            }, 400)
         
         session_id = data.get('session_id')
         message = data.get('message')
         
         if not session_id or not message:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'Session ID and message are required'
-            }), 400
+            }, 400)
         
         result = symptom_checker.process_message(session_id, message)
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': f'Error processing message: {str(e)}'
-        }), 500
+        }, 500)
+
+@app.route('/api/chat/stream', methods=['POST'])
+@admission_controlled
+def chat_stream():
+    """
+    Process a message in a symptom checker session, streaming the result as Server-Sent Events
+    """
+    try:
+        data = request.json
+        
+        if not data:
+            return json_response({
+                'status': 'error',
+                'message': 'No data provided'
+            }, 400)
+        
+        session_id = data.get('session_id')
+        message = data.get('message')
+        
+        if not session_id or not message:
+            return json_response({
+                'status': 'error',
+                'message': 'Session ID and message are required'
+            }, 400)
+        
+        response = Response(stream_with_context(chat_events(session_id, message)), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except Exception as e:
+        return json_response({
+            'status': 'error',
+            'message': f'Error processing message: {str(e)}'
+        }, 500)
 
 @app.route('/api/end_session', methods=['POST'])
 def end_session():
@@ -66,29 +231,30 @@ def end_session():
         data = request.json
         
         if not data:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'No data provided'
-            }), 400
+            }, 400)
         
         session_id = data.get('session_id')
         
         if not session_id:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'Session ID is required'
-            }), 400
+            }, 400)
         
         result = symptom_checker.end_session(session_id)
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': f'Error ending session: {str(e)}'
-        }), 500
+        }, 500)
 
 @app.route('/api/check_symptoms', methods=['POST'])
+@admission_controlled
 def check_symptoms():
     """
     Direct symptom check without session management
@@ -97,39 +263,137 @@ def check_symptoms():
         data = request.json
         
         if not data:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'No data provided'
-            }), 400
+            }, 400)
         
         symptoms = data.get('symptoms')
         
         if not symptoms:
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': 'Symptoms are required'
-            }), 400
+            }, 400)
         
         result = symptom_checker.get_response(symptoms)
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'status': 'error',
             'message': f'Error checking symptoms: {str(e)}'
-        }), 500
+        }, 500)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """
     Health check endpoint
     """
-    return jsonify({
+    answer_table = symptom_checker.answer_table
+    return json_response({
+        'status': 'success',
+        'message': 'Symptom checker API is running',
+        'answer_table': answer_table.stats() if answer_table is not None else None,
+        'single_flight': symptom_checker.single_flight.stats(),
+        'anytime_forest': symptom_checker.anytime_forest.stats() if symptom_checker.anytime_forest is not None else None,
+        'conversation_log': conversation_log.stats() if conversation_log is not None else None
+    })
+
+@app.route('/api/admission_stats', methods=['GET'])
+def admission_stats():
+    """
+    Counters for admitted and shed inference requests
+    """
+    return json_response({
         'status': 'success',
-        'message': 'Symptom checker API is running'
+        'admission': admission.stats()
     })
 
+@app.route('/api/admin/session_stats', methods=['GET'])
+@admin_required
+def session_stats():
+    """
+    Memory accounting for active sessions (admin only)
+    """
+    try:
+        top = int(request.args.get('top', 10))
+        dump = request.args.get('dump', '0') == '1'
+        
+        stats = collect_session_stats(symptom_checker.active_sessions, top_n=top, dump=dump)
+        if request.args.get('tracemalloc', '0') == '1':
+            stats['tracemalloc'] = tracemalloc_breakdown()
+        
+        return json_response({
+            'status': 'success',
+            'sessions': stats
+        })
+        
+    except Exception as e:
+        return json_response({
+            'status': 'error',
+            'message': f'Error collecting session stats: {str(e)}'
+        }, 500)
+
+@app.route('/api/admin/sessions/export', methods=['POST'])
+@admin_required
+def export_sessions():
+    """
+    Export sessions for migration to another node (admin only)
+    """
+    try:
+        data = request.json or {}
+        sessions = symptom_checker.export_sessions(data.get('session_ids'), remove=data.get('remove', False))
+        return json_response({
+            'status': 'success',
+            'sessions': sessions
+        })
+        
+    except Exception as e:
+        return json_response({
+            'status': 'error',
+            'message': f'Error exporting sessions: {str(e)}'
+        }, 500)
+
+@app.route('/api/admin/sessions/import', methods=['POST'])
+@admin_required
+def import_sessions():
+    """
+    Import sessions exported by another node (admin only)
+    """
+    try:
+        data = request.json
+        
+        if not data or 'sessions' not in data:
+            return json_response({
+                'status': 'error',
+                'message': 'Sessions are required'
+            }, 400)
+        
+        imported = symptom_checker.import_sessions(data['sessions'])
+        return json_response({
+            'status': 'success',
+            'imported': imported
+        })
+        
+    except Exception as e:
+        return json_response({
+            'status': 'error',
+            'message': f'Error importing sessions: {str(e)}'
+        }, 500)
+
+def handle_sigterm(signum, frame):
+    """
+    Flush the conversation log on SIGTERM; atexit alone does not run when the process is terminated
+    """
+    if conversation_log is not None:
+        conversation_log.close()
+    sys.exit(0)
+
 if __name__ == '__main__':
+    # Only for `python app.py`; WSGI servers install their own SIGTERM handling
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV', 'development') == 'development'
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,78 @@
+import argparse
+import json
+import time
+from models.symptom_checker import SymptomChecker
+from train_model.generate_synthetic_data import load_intents
+
+
+def time_predictions(checker: SymptomChecker, patterns: list) -> tuple:
+    """
+    Run every pattern through predict_condition end to end
+
+    Returns:
+        tuple: (results, total seconds)
+    """
+    results = []
+    start = time.perf_counter()
+    for pattern in patterns:
+        results.append(checker.predict_condition(pattern))
+    return results, time.perf_counter() - start
+
+
+def same_prediction(a: dict, b: dict) -> bool:
+    """
+    Compare two predict_condition results on everything except confidence
+
+    Early exit guarantees the same predicted class; confidence is then an estimate
+    from the trees evaluated and is reported separately.
+    """
+    strip = lambda result: {k: v for k, v in result.items() if k != 'confidence'}
+    return json.dumps(strip(a), sort_keys=True, default=float) == json.dumps(strip(b), sort_keys=True, default=float)
+
+
+def confidence_diff(a: dict, b: dict) -> float:
+    """
+    Absolute difference between the confidences of two results (0 if either has none)
+    """
+    if 'confidence' not in a or 'confidence' not in b:
+        return 0.0
+    return abs(float(a['confidence']) - float(b['confidence']))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='predict_condition latency with and without early-exit forest evaluation')
+    parser.add_argument('--model-dir', default='models', help='Directory with the trained model artifacts')
+    parser.add_argument('--data', default='data/symptom_intents.json', help='Intents file whose patterns are replayed')
+    parser.add_argument('--chunk-size', type=int, default=10, help='Trees evaluated between early-exit checks')
+    args = parser.parse_args()
+
+    # The answer table would short-circuit the replayed training patterns
+    full = SymptomChecker(model_dir=args.model_dir, use_answer_table=False)
+    anytime = SymptomChecker(model_dir=args.model_dir, use_answer_table=False,
+                             anytime_inference=True, anytime_chunk_size=args.chunk_size)
+
+    patterns = [p for intent in load_intents(args.data) for p in intent['patterns']]
+
+    # Warm up spaCy and the forests so the first timed call is not an outlier
+    full.predict_condition(patterns[0])
+    anytime.predict_condition(patterns[0])
+
+    full_results, full_total = time_predictions(full, patterns)
+    anytime_results, anytime_total = time_predictions(anytime, patterns)
+
+    mismatches = sum(not same_prediction(a, b) for a, b in zip(full_results, anytime_results))
+    diffs = [confidence_diff(a, b) for a, b in zip(full_results, anytime_results)]
+    stats = anytime.anytime_forest.stats()
+
+    print(json.dumps({
+        'messages': len(patterns),
+        'trees_per_forest': stats['trees_per_forest'],
+        'avg_trees_evaluated': stats['avg_trees_evaluated'],
+        'early_exit_rate': stats['early_exit_rate'],
+        'predict_condition_mean_ms': 1000.0 * full_total / len(patterns),
+        'predict_condition_anytime_mean_ms': 1000.0 * anytime_total / len(patterns),
+        'anytime_saved_pct': 100.0 * (1 - anytime_total / full_total) if full_total else 0.0,
+        'mismatches': int(mismatches),
+        'mean_confidence_diff': sum(diffs) / len(diffs) if diffs else 0.0,
+        'max_confidence_diff': max(diffs) if diffs else 0.0
+    }, indent=2))
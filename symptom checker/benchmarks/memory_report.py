@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import pickle
+import re
+import subprocess
+import sys
+import tracemalloc
+from typing import Dict, Any, List
+import numpy as np
+from models.compact_vectorizer import CompactTfidfVectorizer, load_vectorizer
+
+
+def resident_kb() -> int:
+    """
+    Current resident set size of this process in kB (Linux)
+    """
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def measure_worker(model_dir: str, compact: bool) -> Dict[str, Any]:
+    """
+    Load the vectorizer and the forest the way SymptomChecker does and report memory
+    """
+    baseline = resident_kb()
+
+    tracemalloc.start()
+    vectorizer = load_vectorizer(model_dir, compact=compact)
+    vectorizer_bytes = tracemalloc.get_traced_memory()[0]
+    vectorizer_peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    after_vectorizer = resident_kb()
+    with open(os.path.join(model_dir, 'classifier.pkl'), 'rb') as f:
+        classifier = pickle.load(f)
+    after_classifier = resident_kb()
+
+    return {
+        'vectorizer_type': type(vectorizer).__name__,
+        'vectorizer_traced_bytes': vectorizer_bytes,
+        'vectorizer_peak_traced_bytes': vectorizer_peak_bytes,
+        'vectorizer_rss_kb': after_vectorizer - baseline,
+        'classifier_rss_kb': after_classifier - after_vectorizer,
+        'worker_rss_kb': after_classifier,
+        'n_estimators': len(classifier.estimators_)
+    }
+
+
+def run_worker(model_dir: str, compact: bool) -> Dict[str, Any]:
+    """
+    Measure in a fresh interpreter so allocations from other models do not leak in
+    """
+    output = subprocess.check_output([
+        sys.executable, '-m', 'benchmarks.memory_report',
+        '--child', model_dir, '1' if compact else '0'
+    ])
+    return json.loads(output)
+
+
+def compare_features(vectorizer: Any, compact: CompactTfidfVectorizer, classifier: Any, texts: List[str]) -> Dict[str, Any]:
+    """
+    Check the compact features and predictions against the original vectorizer
+    """
+    X_original = vectorizer.transform(texts)
+    X_compact = compact.transform(texts)
+    diff = abs(X_original - X_compact.astype(np.float64))
+
+    return {
+        'documents': len(texts),
+        'max_abs_feature_diff': float(diff.max()) if diff.nnz else 0.0,
+        'prediction_agreement': float(np.mean(classifier.predict(X_original) == classifier.predict(X_compact)))
+    }
+
+
+def load_texts(data_path: str) -> List[str]:
+    """
+    Training patterns, lowercased and stripped of punctuation
+    """
+    with open(data_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    intents = data['intents'] if isinstance(data, dict) else data
+    return [re.sub(r'[^\w\s]', '', p.lower()) for item in intents for p in item['patterns']]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        print(json.dumps(measure_worker(sys.argv[2], sys.argv[3] == '1')))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='Per-worker memory of the original and compact vectorizer')
+    parser.add_argument('--model-dir', default='models', help='Directory with the trained model artifacts')
+    parser.add_argument('--data', default='data/symptom_intents.json', help='Intents file used for the fidelity check')
+    args = parser.parse_args()
+
+    vectorizer_path = os.path.join(args.model_dir, 'vectorizer.pkl')
+    compact_path = os.path.join(args.model_dir, 'compact_vectorizer.pkl')
+    if not os.path.exists(compact_path):
+        print(f"{compact_path} not found; the compact worker converts vectorizer.pkl at load. "
+              "Retrain to write it.", file=sys.stderr)
+
+    vectorizer = load_vectorizer(args.model_dir)
+    compact = load_vectorizer(args.model_dir, compact=True)
+    with open(os.path.join(args.model_dir, 'classifier.pkl'), 'rb') as f:
+        classifier = pickle.load(f)
+
+    report = {
+        'original': run_worker(args.model_dir, False),
+        'compact': run_worker(args.model_dir, True),
+        'compact_source': 'compact_vectorizer.pkl' if os.path.exists(compact_path) else 'converted from vectorizer.pkl',
+        'pickle_bytes': {
+            'original': os.path.getsize(vectorizer_path),
+            'compact': os.path.getsize(compact_path) if os.path.exists(compact_path) else None
+        },
+        'fidelity': compare_features(vectorizer, compact, classifier, load_texts(args.data))
+    }
+
+    print(json.dumps(report, indent=2))
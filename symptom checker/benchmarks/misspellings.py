@@ -0,0 +1,143 @@
+import argparse
+import json
+import random
+import string
+import time
+from typing import Dict, Any, List, Tuple
+from models.symptom_checker import SymptomChecker
+from train_model.generate_synthetic_data import load_intents
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """
+    Apply one random keyboard-style edit: deletion, transposition, substitution or duplication
+    """
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(['delete', 'swap', 'substitute', 'duplicate'])
+
+    if edit == 'delete':
+        return word[:i] + word[i + 1:]
+    if edit == 'swap':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if edit == 'substitute':
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+# Correctly spelled messages that mention no symptom; common words close to a
+# symptom ('never'/'fever', 'cold and'/'cold hands') are included on purpose
+CLEAN_MESSAGES = [
+    'I have never felt like this',
+    'I feel fine today',
+    'What should I do',
+    'My father has been worried about me',
+    'I went to the store yesterday',
+    'Can you help me please',
+    'I am feeling better now',
+    'It started after dinner',
+    'The weather is cold and rainy',
+    'My child keeps crying at night',
+    'I think I need to see a doctor',
+    'I wonder whether this is serious',
+    'It happens every morning',
+    'My sister had the same thing last year',
+    'I would rather not say',
+    'Is this something I should worry about',
+    'I have been travelling a lot lately',
+    'Nothing has changed since yesterday'
+]
+
+
+def build_clean_cases(data_path: str, conversation_intents: List[str]) -> List[str]:
+    """
+    Clean messages plus the conversation-intent patterns, none of which name a symptom
+    """
+    patterns = [p for intent in load_intents(data_path) if intent['tag'] in conversation_intents for p in intent['patterns']]
+    return CLEAN_MESSAGES + patterns
+
+
+def false_positives(checker: SymptomChecker, messages: List[str]) -> Dict[str, Any]:
+    """
+    Count clean messages in which extract_symptoms reports a known symptom
+    """
+    vocabulary = set(checker.symptom_vocabulary)
+    flagged = []
+    for message in messages:
+        found = [symptom for symptom in checker.extract_symptoms(message) if symptom in vocabulary]
+        if found:
+            flagged.append({'message': message, 'symptoms': found})
+
+    return {
+        'clean_messages': len(messages),
+        'false_positive_rate': len(flagged) / len(messages) if messages else 0.0,
+        'false_positives': flagged
+    }
+
+
+def build_cases(vocabulary: List[str], per_term: int, seed: int) -> List[Tuple[str, str]]:
+    """
+    Build (message, expected symptom) pairs with one misspelled word per symptom
+    """
+    rng = random.Random(seed)
+    cases = []
+
+    for symptom in vocabulary:
+        words = symptom.lower().split()
+        # Only words long enough to be given an edit budget are misspelled
+        candidates = [i for i, w in enumerate(words) if len(w) >= 5]
+        if not candidates or len(words) > 4:
+            continue
+
+        for _ in range(per_term):
+            i = rng.choice(candidates)
+            typo = words[:i] + [misspell(words[i], rng)] + words[i + 1:]
+            cases.append((f"I have {' '.join(typo)}", symptom))
+
+    return cases
+
+
+def run(checker: SymptomChecker, cases: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Compare exact substring matching with extract_symptoms on the misspelled cases
+    """
+    exact_hits = 0
+    fuzzy_hits = 0
+    latencies = []
+
+    for message, expected in cases:
+        text = message.lower()
+        if expected.lower() in text:
+            exact_hits += 1
+
+        start = time.perf_counter()
+        extracted = checker.extract_symptoms(message)
+        latencies.append(time.perf_counter() - start)
+
+        if expected in extracted:
+            fuzzy_hits += 1
+
+    latencies.sort()
+    total = len(cases)
+    return {
+        'cases': total,
+        'vocabulary_size': len(checker.symptom_vocabulary),
+        'exact_recall': exact_hits / total if total else 0.0,
+        'fuzzy_recall': fuzzy_hits / total if total else 0.0,
+        'extract_mean_ms': 1000.0 * sum(latencies) / total if total else 0.0,
+        'extract_p95_ms': 1000.0 * latencies[int(0.95 * (total - 1))] if total else 0.0
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Misspelling benchmark for symptom extraction')
+    parser.add_argument('--model-dir', default='models', help='Directory with the trained model artifacts')
+    parser.add_argument('--data', default='data/symptom_intents.json', help='Intents file whose conversation patterns are used as clean messages')
+    parser.add_argument('--per-term', type=int, default=3, help='Misspellings generated per symptom')
+    parser.add_argument('--seed', type=int, default=13, help='Random seed for misspellings')
+    args = parser.parse_args()
+
+    checker = SymptomChecker(model_dir=args.model_dir)
+    cases = build_cases(checker.symptom_vocabulary, args.per_term, args.seed)
+    report = run(checker, cases)
+    report.update(false_positives(checker, build_clean_cases(args.data, checker.conversation_intents)))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, Any, List
+from models.symptom_checker import SymptomChecker
+from train_model.train_model import SymptomCheckerTrainer
+from train_model.generate_synthetic_data import load_intents
+
+
+def timed(func, inputs: List[str]) -> Dict[str, float]:
+    """
+    Call func on each input and summarize latency in milliseconds
+    """
+    latencies = []
+    for text in inputs:
+        start = time.perf_counter()
+        func(text)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+    latencies.sort()
+    return {
+        'mean_ms': sum(latencies) / len(latencies),
+        'p50_ms': latencies[len(latencies) // 2],
+        'p95_ms': latencies[int(0.95 * (len(latencies) - 1))],
+        'max_ms': latencies[-1]
+    }
+
+
+def sample_messages(data_path: str, count: int, seed: int) -> List[str]:
+    """
+    Sample training patterns and lightly perturb them so they are not verbatim copies
+    """
+    rng = random.Random(seed)
+    patterns = [p for intent in load_intents(data_path) for p in intent['patterns']]
+    messages = []
+    for pattern in rng.sample(patterns, min(count, len(patterns))):
+        parts = [p.strip() for p in pattern.split(',')]
+        rng.shuffle(parts)
+        messages.append('I think I have ' + ', '.join(parts))
+    return messages
+
+
+def benchmark(data_path: str, requests: int, seed: int) -> Dict[str, Any]:
+    """
+    Train on one intents file, then measure artifacts and serving costs
+    """
+    with tempfile.TemporaryDirectory() as model_dir:
+        trainer = SymptomCheckerTrainer(data_path=data_path, model_dir=model_dir)
+
+        start = time.perf_counter()
+        trainer.train_model(build_answer_table=False)
+        train_seconds = time.perf_counter() - start
+
+        artifacts = {name: os.path.getsize(os.path.join(model_dir, name)) for name in sorted(os.listdir(model_dir))}
+
+        start = time.perf_counter()
+        checker = SymptomChecker(model_dir=model_dir, use_answer_table=False)
+        load_seconds = time.perf_counter() - start
+
+        messages = sample_messages(data_path, requests, seed)
+        intents = load_intents(data_path)
+
+        return {
+            'data_path': data_path,
+            'intents': len(intents),
+            'patterns': sum(len(intent['patterns']) for intent in intents),
+            'vocabulary_size': len(checker.symptom_vocabulary),
+            'train_seconds': train_seconds,
+            'load_seconds': load_seconds,
+            'artifact_bytes': sum(artifacts.values()),
+            'artifacts': artifacts,
+            'extract_symptoms': timed(checker.extract_symptoms, messages),
+            'get_response': timed(checker.get_response, messages)
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure how training and serving scale with the intents file')
+    parser.add_argument('data', nargs='+', help='Intents files, e.g. data/synthetic/symptom_intents_x10.json')
+    parser.add_argument('--requests', type=int, default=200, help='Messages timed per file')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed for sampled messages')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    report = [benchmark(path, args.requests, args.seed) for path in args.data]
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
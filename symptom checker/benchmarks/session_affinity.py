@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+from models.session_routing import SessionRouter, session_owner
+
+ADMIN_TOKEN = 'local-cluster-token'
+
+
+def start_nodes(count: int, base_port: int) -> Dict[str, subprocess.Popen]:
+    """
+    Start several API instances, each with its own NODE_ID and port
+    """
+    processes = {}
+    for i in range(count):
+        env = dict(os.environ, PORT=str(base_port + i), NODE_ID=f'node{i}', ADMIN_API_TOKEN=ADMIN_TOKEN,
+                   FLASK_ENV='production', CONVERSATION_LOG_PATH='', RATE_LIMIT_PER_SECOND='0')
+        processes[f'node{i}'] = subprocess.Popen([sys.executable, 'app.py'], env=env)
+    return processes
+
+
+def wait_healthy(urls: List[str], timeout: float = 120.0) -> None:
+    """
+    Wait until every node answers its health check
+    """
+    deadline = time.time() + timeout
+    for url in urls:
+        while True:
+            try:
+                urllib.request.urlopen(url + '/api/health', timeout=2)
+                break
+            except (urllib.error.URLError, ConnectionError):
+                if time.time() > deadline:
+                    raise RuntimeError(f'{url} did not become healthy')
+                time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run conversations through the session router across local API nodes')
+    parser.add_argument('--nodes', type=int, default=3, help='Number of API instances to start')
+    parser.add_argument('--base-port', type=int, default=5101, help='Port of the first instance')
+    parser.add_argument('--sessions', type=int, default=30, help='Conversations to run')
+    args = parser.parse_args()
+
+    processes = start_nodes(args.nodes, args.base_port)
+    urls = {node: f'http://127.0.0.1:{args.base_port + i}' for i, node in enumerate(processes)}
+
+    try:
+        wait_healthy(list(urls.values()))
+        router = SessionRouter(urls, admin_token=ADMIN_TOKEN)
+
+        session_ids = [router.start_session()['session_id'] for _ in range(args.sessions)]
+        for session_id in session_ids:
+            router.chat(session_id, 'cough, high fever, breathlessness')
+
+        placement = {node: sum(session_owner(s) == node for s in session_ids) for node in urls}
+
+        # Take one node out; its sessions must keep their context on the new owner
+        leaving = 'node0'
+        moved = router.remove_node(leaving)
+
+        ended = [router.end_session(session_id) for session_id in session_ids]
+        lost = [r for r in ended if r.get('status') != 'success']
+
+        print(json.dumps({
+            'sessions': len(session_ids),
+            'placement': placement,
+            'removed_node': leaving,
+            'migrated': moved,
+            'sessions_lost': len(lost)
+        }, indent=2))
+
+    finally:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.wait()
@@ -0,0 +1,116 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+
+class AdmissionController:
+    def __init__(self, rate: float = 5.0, burst: int = 10, max_inflight: int = 8, max_clients: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Per-client token-bucket rate limiting plus a global cap on in-flight inference
+
+        Args:
+            rate: Tokens added per second to each client's bucket (0 disables rate limiting)
+            burst: Bucket capacity, i.e. the largest burst a client may send at once (0 disables rate limiting)
+            max_inflight: Requests allowed to run inference concurrently (0 disables the cap)
+            max_clients: Buckets kept in memory; the least recently seen client is evicted first
+            clock: Monotonic time source in seconds
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self.max_clients = max_clients
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._inflight = 0
+
+        self.admitted = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+        self.peak_inflight = 0
+
+    def _take_token(self, client_id: str, now: float) -> float:
+        """
+        Take a token from the client's bucket
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        tokens, last = self._buckets.pop(client_id, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+
+        if tokens >= 1.0:
+            self._buckets[client_id] = (tokens - 1.0, now)
+            wait = 0.0
+        else:
+            self._buckets[client_id] = (tokens, now)
+            wait = (1.0 - tokens) / self.rate
+
+        # Re-inserted at the end, so the first key is the least recently seen client
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+        return wait
+
+    def admit(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Decide whether a request may run
+
+        Returns:
+            dict: None if admitted (call release() when done), otherwise the rejection
+                with 'status_code', 'retry_after' (seconds) and 'message'
+        """
+        with self._lock:
+            # Checked first so a request shed for overload does not also spend the client's token
+            if self.max_inflight > 0 and self._inflight >= self.max_inflight:
+                self.overloaded += 1
+                return {
+                    'status_code': 503,
+                    'retry_after': 1,
+                    'message': 'The symptom checker is busy. Please try again shortly.'
+                }
+
+            if self.rate > 0 and self.burst > 0:
+                wait = self._take_token(client_id, self.clock())
+                if wait > 0:
+                    self.rate_limited += 1
+                    return {
+                        'status_code': 429,
+                        'retry_after': max(1, math.ceil(wait)),
+                        'message': 'Too many requests. Please slow down and try again shortly.'
+                    }
+
+            self._inflight += 1
+            self.admitted += 1
+            self.peak_inflight = max(self.peak_inflight, self._inflight)
+            return None
+
+    def release(self) -> None:
+        """
+        Release an in-flight slot taken by admit()
+        """
+        with self._lock:
+            self._inflight = max(0, self._inflight - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return admission counters
+        """
+        with self._lock:
+            return {
+                'admitted': self.admitted,
+                'shed_rate_limited': self.rate_limited,
+                'shed_overloaded': self.overloaded,
+                'inflight': self._inflight,
+                'peak_inflight': self.peak_inflight,
+                'tracked_clients': len(self._buckets),
+                'limits': {
+                    'rate': self.rate,
+                    'burst': self.burst,
+                    'max_inflight': self.max_inflight
+                }
+            }
@@ -0,0 +1,106 @@
+import copy
+import pickle
+import re
+import threading
+from typing import Callable, Dict, Any, Iterable, Optional
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a message for exact-match lookup
+
+    Only differences the prediction pipeline ignores are removed: letter case and
+    runs of spaces. 'and' keeps its case because extract_symptoms only splits on a
+    lowercase ' and ', and punctuation is kept because preprocess_text deletes it
+    without inserting a space (so 'cough,fever' and 'cough, fever' differ).
+    """
+    words = [word for word in text.split(' ') if word]
+    return ' '.join(word if word.lower() == 'and' else word.lower() for word in words)
+
+
+class AnswerTable:
+    def __init__(self, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Lookup table of precomputed prediction results keyed by message
+
+        Args:
+            entries: Mapping of pattern text, or its normalized alias, to the predict_condition result
+        """
+        self.entries = entries or {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def build(cls, patterns: Iterable[str], predict: Callable[[str], Dict[str, Any]]) -> 'AnswerTable':
+        """
+        Precompute results for every training pattern
+
+        Each pattern is stored under its own text with the result the live pipeline
+        returns for it. Its normalized form is added as an alias only when predicting
+        on that form gives the same result.
+
+        Args:
+            patterns: Training patterns from the intents file
+            predict: Function returning the full prediction result for a message
+        """
+        entries = {}
+        for pattern in patterns:
+            if not pattern.strip() or pattern in entries:
+                continue
+
+            result = predict(pattern)
+            if result.get('status') == 'error':
+                continue
+            entries[pattern] = result
+
+            key = normalize_text(pattern)
+            if key and key not in entries and predict(key) == result:
+                entries[key] = result
+
+        return cls(entries)
+
+    @classmethod
+    def load(cls, path: str) -> 'AnswerTable':
+        """
+        Load a table saved by the trainer
+        """
+        with open(path, 'rb') as f:
+            return cls(pickle.load(f))
+
+    def save(self, path: str) -> None:
+        """
+        Save the table entries
+        """
+        with open(path, 'wb') as f:
+            pickle.dump(self.entries, f)
+
+    def lookup(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a copy of the precomputed result for text, or None on a miss
+        """
+        result = self.entries.get(text)
+        if result is None:
+            result = self.entries.get(normalize_text(text))
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        # Callers may store or modify the result, so never hand out the shared entry
+        return copy.deepcopy(result) if result is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return table size and hit counters
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
@@ -0,0 +1,76 @@
+import threading
+from typing import Any, Callable, Dict, Tuple
+import numpy as np
+
+
+class AnytimeForest:
+    def __init__(self, forest: Any, chunk_size: int = 10):
+        """
+        Evaluate a fitted RandomForestClassifier in chunks of trees, stopping early once a decision is settled
+
+        Each tree contributes a probability row that sums to 1, so after t of n
+        trees no class can gain more than n - t on the accumulated sum. A caller's
+        decision function uses that bound to tell when the remaining trees can no
+        longer change its answer. Trees are accumulated in the same order as
+        sklearn's sequential predict_proba, so a full evaluation returns exactly
+        the same probabilities.
+
+        Args:
+            forest: Fitted RandomForestClassifier
+            chunk_size: Trees evaluated between decision checks
+        """
+        self.forest = forest
+        self.chunk_size = chunk_size
+        self.n_trees = len(forest.estimators_)
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.trees_evaluated = 0
+        self.early_exits = 0
+
+    def predict_proba(self, X: Any, decided: Callable[[np.ndarray, int], bool]) -> Tuple[np.ndarray, int]:
+        """
+        Accumulate tree probabilities for a single row until decided(sums, remaining) is True
+
+        Args:
+            X: Feature matrix with one row
+            decided: Called with the per-class probability sums so far and the number of
+                trees left; returning True stops evaluation
+
+        Returns:
+            tuple: (probabilities, trees evaluated); the probabilities are final only
+                when every tree was evaluated, otherwise they are partial sums
+        """
+        X = self.forest._validate_X_predict(X)
+        sums = np.zeros((X.shape[0], self.forest.n_classes_), dtype=np.float64)
+
+        evaluated = 0
+        while evaluated < self.n_trees:
+            for tree in self.forest.estimators_[evaluated:evaluated + self.chunk_size]:
+                sums += tree.predict_proba(X, check_input=False)
+            evaluated = min(evaluated + self.chunk_size, self.n_trees)
+
+            if evaluated < self.n_trees and decided(sums[0], self.n_trees - evaluated):
+                break
+
+        with self._lock:
+            self.calls += 1
+            self.trees_evaluated += evaluated
+            if evaluated < self.n_trees:
+                self.early_exits += 1
+
+        if evaluated == self.n_trees:
+            sums /= self.n_trees
+        return sums[0], evaluated
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return average trees evaluated and the early-exit rate
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'trees_per_forest': self.n_trees,
+                'avg_trees_evaluated': self.trees_evaluated / self.calls if self.calls else 0.0,
+                'early_exit_rate': self.early_exits / self.calls if self.calls else 0.0
+            }
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import pickle
+import re
+from collections import Counter
+from typing import Any, Iterable
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def term_hash(term: str) -> int:
+    """
+    Stable 64-bit hash of a vocabulary term
+    """
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class CompactTfidfVectorizer:
+    def __init__(self, hashes: np.ndarray, columns: np.ndarray, idf: np.ndarray, n_features: int,
+                 token_pattern: str, lowercase: bool = True, norm: str = 'l2', sublinear_tf: bool = False):
+        """
+        Memory-compact, transform-only replacement for a fitted TfidfVectorizer
+
+        The vocabulary is stored as a sorted uint64 array of term hashes with an
+        int32 column map, and the IDF weights as float32, instead of a dict of
+        Python strings and float64 values. Features are computed in float32, so they
+        differ from the original vectorizer by at most ~1e-7 relative error; the
+        random forest already casts its input to float32, so a prediction can only
+        change if a feature lands within that distance of a split threshold.
+
+        Args:
+            hashes: Sorted 64-bit hashes of the vocabulary terms
+            columns: Feature column for each hash
+            idf: float32 IDF weight per feature column
+            n_features: Number of feature columns
+            token_pattern: Regular expression used to tokenize documents
+            lowercase: Whether documents are lowercased before tokenizing
+            norm: Row normalization ('l2', 'l1' or None)
+            sublinear_tf: Whether term frequencies are replaced by 1 + log(tf)
+        """
+        self.hashes = hashes
+        self.columns = columns
+        self.idf = idf
+        self.n_features = n_features
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_tfidf(cls, vectorizer: Any) -> 'CompactTfidfVectorizer':
+        """
+        Build a compact vectorizer from a fitted sklearn TfidfVectorizer
+
+        Raises:
+            ValueError: If the vectorizer uses options the compact form does not reproduce
+        """
+        if vectorizer.analyzer != 'word' or tuple(vectorizer.ngram_range) != (1, 1):
+            raise ValueError("Compact vectorizer only supports word unigrams")
+        if vectorizer.stop_words is not None or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+            raise ValueError("Compact vectorizer does not support custom stop words, preprocessors or tokenizers")
+        if vectorizer.strip_accents is not None or vectorizer.binary:
+            raise ValueError("Compact vectorizer does not support strip_accents or binary features")
+        if vectorizer.norm not in ('l1', 'l2', None):
+            raise ValueError(f"Unsupported norm: {vectorizer.norm}")
+
+        terms = list(vectorizer.vocabulary_.keys())
+        hashes = np.array([term_hash(t) for t in terms], dtype=np.uint64)
+        columns = np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int32)
+
+        if len(np.unique(hashes)) != len(hashes):
+            raise ValueError("Hash collision in vocabulary; keep the original vectorizer")
+
+        order = np.argsort(hashes)
+        n_features = len(terms)
+        idf = vectorizer.idf_.astype(np.float32) if vectorizer.use_idf else np.ones(n_features, dtype=np.float32)
+
+        return cls(
+            hashes=hashes[order],
+            columns=columns[order],
+            idf=idf,
+            n_features=n_features,
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            norm=vectorizer.norm,
+            sublinear_tf=vectorizer.sublinear_tf
+        )
+
+    def _lookup(self, term: str) -> int:
+        """
+        Column index of a term, or -1 if it is out of vocabulary
+        """
+        h = np.uint64(term_hash(term))
+        pos = int(np.searchsorted(self.hashes, h))
+        if pos < len(self.hashes) and self.hashes[pos] == h:
+            return int(self.columns[pos])
+        return -1
+
+    def transform(self, raw_documents: Iterable[str]) -> csr_matrix:
+        """
+        Transform documents to a float32 TF-IDF matrix
+        """
+        indptr = [0]
+        indices = []
+        data = []
+
+        for doc in raw_documents:
+            if self.lowercase:
+                doc = doc.lower()
+
+            counts = Counter()
+            for token in self._token_re.findall(doc):
+                column = self._lookup(token)
+                if column >= 0:
+                    counts[column] += 1
+
+            cols = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+            tf = np.array([counts[c] for c in cols], dtype=np.float32)
+            if self.sublinear_tf:
+                tf = np.log(tf) + np.float32(1.0)
+            values = tf * self.idf[cols]
+
+            if self.norm == 'l2' and len(values):
+                values /= np.sqrt(np.dot(values, values))
+            elif self.norm == 'l1' and len(values):
+                values /= np.abs(values).sum()
+
+            indices.append(cols)
+            data.append(values)
+            indptr.append(indptr[-1] + len(cols))
+
+        return csr_matrix(
+            (np.concatenate(data) if data else np.empty(0, dtype=np.float32),
+             np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+             np.array(indptr, dtype=np.int32)),
+            shape=(len(indptr) - 1, self.n_features),
+            dtype=np.float32
+        )
+
+    def nbytes(self) -> int:
+        """
+        Bytes held by the vocabulary and IDF arrays
+        """
+        return self.hashes.nbytes + self.columns.nbytes + self.idf.nbytes
+
+
+def load_vectorizer(model_dir: str, compact: bool = False) -> Any:
+    """
+    Load the serving vectorizer from a model directory
+
+    In compact mode the trainer's compact_vectorizer.pkl is loaded directly, so the
+    full TfidfVectorizer is never unpickled; models trained before it existed fall
+    back to converting vectorizer.pkl after loading.
+    """
+    compact_path = os.path.join(model_dir, 'compact_vectorizer.pkl')
+    if compact and os.path.exists(compact_path):
+        with open(compact_path, 'rb') as f:
+            return pickle.load(f)
+
+    with open(os.path.join(model_dir, 'vectorizer.pkl'), 'rb') as f:
+        vectorizer = pickle.load(f)
+
+    return CompactTfidfVectorizer.from_tfidf(vectorizer) if compact else vectorizer
@@ -0,0 +1,134 @@
+import json
+import os
+import queue
+import threading
+from typing import Dict, Any, List, Optional
+from models.serialization import json_default
+
+
+class ConversationLog:
+    def __init__(self, path: str, max_queue_size: int = 10000, batch_size: int = 100, flush_interval: float = 1.0):
+        """
+        Append-only JSONL conversation log with a background writer thread
+
+        Args:
+            path: File that conversation entries are appended to
+            max_queue_size: Maximum number of entries waiting to be written
+            batch_size: Maximum number of entries written per flush
+            flush_interval: Seconds the writer waits before flushing a partial batch
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # Bounded queue so a slow disk cannot grow worker memory without limit
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self.written = 0
+        self.dropped = 0
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+        self._thread = threading.Thread(target=self._run, name='conversation-log-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, entry: Dict[str, Any]) -> bool:
+        """
+        Enqueue an entry for writing without blocking the request path
+
+        Returns:
+            bool: False if the queue was full or the log is closed and the entry was dropped
+        """
+        if self._stop.is_set():
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _drain(self, first: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Collect up to batch_size queued entries
+        """
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Write a batch of entries as JSON lines and flush to disk
+        """
+        if not batch:
+            return
+
+        lines = [json.dumps(entry, default=json_default, ensure_ascii=False) for entry in batch]
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+
+        with self._lock:
+            self.written += len(batch)
+
+    def _run(self) -> None:
+        """
+        Writer loop: wait for entries, then write them in batches
+        """
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            try:
+                self._write(self._drain(first))
+            except Exception as e:
+                print(f"Error writing conversation log: {e}")
+
+        # Flush anything still queued once shutdown is requested
+        while not self._queue.empty():
+            try:
+                self._write(self._drain())
+            except Exception as e:
+                print(f"Error writing conversation log: {e}")
+                break
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Stop the writer thread after flushing all queued entries
+        """
+        if self._stop.is_set():
+            return
+
+        self._stop.set()
+        self._thread.join(timeout)
+
+        # Leave the file open if the writer is still busy so it can finish
+        if not self._thread.is_alive():
+            self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return writer counters
+        """
+        with self._lock:
+            return {
+                'path': self.path,
+                'queued': self._queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped
+            }
@@ -0,0 +1,136 @@
+import gzip
+import json
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional; gzip is always available
+    brotli = None
+
+
+def json_default(value: Any) -> Any:
+    """
+    Convert values the JSON encoders do not understand natively
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    # Arrays also expose item(), but it raises for more than one element
+    if getattr(value, 'ndim', 0) > 0 and hasattr(value, 'tolist'):
+        return value.tolist()
+
+    # NumPy scalars (e.g. confidence from predict_proba) expose item()
+    if hasattr(value, 'item'):
+        return value.item()
+
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+
+    return str(value)
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Encode payload as compact UTF-8 JSON, using orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=json_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into {coding: quality}
+    """
+    codings = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        codings[name.strip().lower()] = quality
+    return codings
+
+
+class PayloadEncoder:
+    def __init__(self, static_texts: Iterable[str] = (), min_compress_size: int = 512, gzip_level: int = 6, brotli_quality: int = 5):
+        """
+        Serialize API payloads and negotiate response compression
+
+        Args:
+            static_texts: Strings that are sent repeatedly (condition responses and
+                precautions); they are JSON-encoded once up front and spliced in
+            min_compress_size: Bodies smaller than this are sent uncompressed
+            gzip_level: gzip compression level
+            brotli_quality: Brotli quality when the brotli package is installed
+        """
+        self.min_compress_size = min_compress_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+        self.static: Dict[str, bytes] = {}
+        for text in static_texts:
+            if isinstance(text, str) and text not in self.static:
+                self.static[text] = dumps(text)
+
+    def encode(self, payload: Any) -> bytes:
+        """
+        Encode a payload, reusing pre-encoded bytes for known static strings
+        """
+        if not isinstance(payload, dict):
+            return dumps(payload)
+
+        dynamic = {}
+        static = []
+        for key, value in payload.items():
+            if isinstance(key, str) and isinstance(value, str) and value in self.static:
+                static.append((key, self.static[value]))
+            else:
+                dynamic[key] = value
+
+        body = dumps(dynamic)
+        if not static:
+            return body
+
+        # Splice the pre-encoded members in before the closing brace
+        parts = [body[:-1]]
+        separator = b',' if dynamic else b''
+        for key, encoded in static:
+            parts.append(separator + dumps(key) + b':' + encoded)
+            separator = b','
+        parts.append(b'}')
+        return b''.join(parts)
+
+    def compress(self, body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """
+        Compress body with the best coding the client accepts
+
+        Returns:
+            tuple: (possibly compressed body, Content-Encoding value or None)
+        """
+        if len(body) < self.min_compress_size:
+            return body, None
+
+        accepted = parse_accept_encoding(accept_encoding)
+
+        if brotli is not None and accepted.get('br', 0) > 0:
+            return brotli.compress(body, quality=self.brotli_quality), 'br'
+
+        if accepted.get('gzip', 0) > 0:
+            return gzip.compress(body, compresslevel=self.gzip_level), 'gzip'
+
+        return body, None
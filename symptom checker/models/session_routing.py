@@ -0,0 +1,242 @@
+import bisect
+import hashlib
+import json
+import random
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+
+def make_session_id(node_id: Optional[str] = None) -> str:
+    """
+    Generate a session ID, suffixed with the owning node when one is configured
+    """
+    session_id = f"session_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{random.randint(1000, 9999)}"
+    return f"{session_id}_{node_id}" if node_id else session_id
+
+
+def session_owner(session_id: str) -> Optional[str]:
+    """
+    Node encoded in a session ID, or None for IDs issued without one
+    """
+    parts = session_id.split('_', 3)
+    return parts[3] if len(parts) == 4 and parts[0] == 'session' else None
+
+
+def ring_hash(key: str) -> int:
+    """
+    Position of a key on the hash ring
+    """
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class ConsistentHashRing:
+    def __init__(self, nodes: Optional[List[str]] = None, replicas: int = 100):
+        """
+        Consistent-hash ring with virtual nodes
+
+        Args:
+            nodes: Initial node IDs
+            replicas: Virtual nodes per node; more spreads keys more evenly
+        """
+        self.replicas = replicas
+        self._positions: List[int] = []
+        self._owners: List[str] = []
+        self.nodes: List[str] = []
+
+        for node in nodes or []:
+            self.add_node(node)
+
+    def add_node(self, node: str) -> None:
+        """
+        Add a node; only keys that now hash to it change owner
+        """
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+
+        for i in range(self.replicas):
+            position = ring_hash(f'{node}#{i}')
+            index = bisect.bisect(self._positions, position)
+            self._positions.insert(index, position)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node: str) -> None:
+        """
+        Remove a node; its keys move to the next node on the ring
+        """
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+
+        keep = [i for i, owner in enumerate(self._owners) if owner != node]
+        self._positions = [self._positions[i] for i in keep]
+        self._owners = [self._owners[i] for i in keep]
+
+    def node_for(self, key: str) -> Optional[str]:
+        """
+        Node that owns key, or None if the ring is empty
+        """
+        if not self._positions:
+            return None
+        index = bisect.bisect(self._positions, ring_hash(key)) % len(self._positions)
+        return self._owners[index]
+
+
+def http_transport(url: str, payload: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    POST payload as JSON (or GET when payload is None) and decode the JSON reply
+    """
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json', **(headers or {})})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b'{}')
+
+
+class SessionRouter:
+    def __init__(self, nodes: Dict[str, str], admin_token: str = '',
+                 transport: Callable[..., Dict[str, Any]] = http_transport, replicas: int = 100):
+        """
+        In-process stand-in for a session-affinity load balancer
+
+        Requests go to the node encoded in the session ID while it is a member;
+        sessions of departed nodes fall back to their consistent-hash owner, which
+        is also where remove_node() migrates them. Migrated sessions are tracked so
+        add_node() can move them again when a join changes where they route,
+        including back to their original node when it rejoins.
+
+        Args:
+            nodes: Mapping of node ID to API base URL (e.g. 'http://localhost:5001')
+            admin_token: ADMIN_API_TOKEN of the nodes, used for session migration
+            transport: Function (url, payload, headers) -> JSON reply
+            replicas: Virtual nodes per node on the hash ring
+        """
+        self.urls = dict(nodes)
+        self.admin_token = admin_token
+        self.transport = transport
+        self.ring = ConsistentHashRing(list(nodes), replicas=replicas)
+        # Sessions held by a node other than the one encoded in their ID
+        self.relocated: Dict[str, str] = {}
+
+    def node_for_session(self, session_id: str) -> Optional[str]:
+        """
+        Node that should handle a session
+        """
+        owner = session_owner(session_id)
+        if owner in self.urls:
+            return owner
+        return self.ring.node_for(session_id)
+
+    def _call(self, node: str, path: str, payload: Optional[Dict[str, Any]] = None, admin: bool = False) -> Dict[str, Any]:
+        """
+        Send a request to one node
+        """
+        headers = {'X-Admin-Token': self.admin_token} if admin else {}
+        return self.transport(self.urls[node] + path, payload, headers)
+
+    def start_session(self) -> Dict[str, Any]:
+        """
+        Start a session on a node picked by hashing a fresh random key
+        """
+        node = self.ring.node_for(f'new-{random.getrandbits(64)}')
+        return self._call(node, '/api/start_session', {})
+
+    def chat(self, session_id: str, message: str) -> Dict[str, Any]:
+        """
+        Forward a chat message to the session's node
+        """
+        return self._call(self.node_for_session(session_id), '/api/chat', {'session_id': session_id, 'message': message})
+
+    def end_session(self, session_id: str) -> Dict[str, Any]:
+        """
+        Forward an end-session request to the session's node
+        """
+        node = self.node_for_session(session_id)
+        self.relocated.pop(session_id, None)
+        return self._call(node, '/api/end_session', {'session_id': session_id})
+
+    def _move(self, source: str, target: str, session_ids: List[str]) -> int:
+        """
+        Move sessions from source to target and record where they now live
+
+        Returns:
+            int: Number of sessions moved
+        """
+        payload = {'session_ids': session_ids, 'remove': True}
+        sessions = self._call(source, '/api/admin/sessions/export', payload, admin=True).get('sessions', {})
+        if not sessions:
+            return 0
+
+        self._call(target, '/api/admin/sessions/import', {'sessions': sessions}, admin=True)
+        for session_id in sessions:
+            if session_owner(session_id) == target:
+                self.relocated.pop(session_id, None)
+            else:
+                self.relocated[session_id] = target
+        return len(sessions)
+
+    def add_node(self, node: str, url: str, migrate: bool = True) -> Dict[str, int]:
+        """
+        Add a node; sessions started elsewhere stay put, but migrated sessions whose
+        route changed (to the new node, or back to a rejoining owner) move with it
+
+        Returns:
+            dict: Number of sessions moved to each node
+        """
+        self.urls[node] = url
+        self.ring.add_node(node)
+        moved: Dict[str, int] = {}
+
+        if not migrate:
+            return moved
+
+        batches: Dict[Tuple[str, str], List[str]] = {}
+        for session_id, holder in self.relocated.items():
+            target = self.node_for_session(session_id)
+            if target != holder:
+                batches.setdefault((holder, target), []).append(session_id)
+
+        for (source, target), session_ids in batches.items():
+            count = self._move(source, target, session_ids)
+            if count:
+                moved[target] = moved.get(target, 0) + count
+
+        return moved
+
+    def remove_node(self, node: str, migrate: bool = True) -> Dict[str, int]:
+        """
+        Remove a node, moving its sessions to their new consistent-hash owners
+
+        Returns:
+            dict: Number of sessions moved to each node
+        """
+        self.ring.remove_node(node)
+        moved: Dict[str, int] = {}
+
+        # A node is often removed because it is down; its sessions are then lost, but it must still leave
+        exported: Dict[str, Any] = {}
+        if migrate and self.ring.nodes:
+            try:
+                exported = self._call(node, '/api/admin/sessions/export', {'remove': True}, admin=True).get('sessions', {})
+            except (OSError, ValueError):
+                exported = {}
+
+        # Sessions the node held are gone unless they are re-imported below
+        del self.urls[node]
+        self.relocated = {session_id: holder for session_id, holder in self.relocated.items() if holder != node}
+
+        batches: Dict[str, Dict[str, Any]] = {}
+        for session_id, session in exported.items():
+            batches.setdefault(self.node_for_session(session_id), {})[session_id] = session
+
+        for target, sessions in batches.items():
+            self._call(target, '/api/admin/sessions/import', {'sessions': sessions}, admin=True)
+            for session_id in sessions:
+                self.relocated[session_id] = target
+            moved[target] = len(sessions)
+
+        return moved
@@ -0,0 +1,151 @@
+import copy
+import sys
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# Upper bounds (seconds) of the session age buckets
+AGE_BUCKETS = [('<1m', 60), ('<10m', 600), ('<1h', 3600), ('<24h', 86400), ('>=24h', None)]
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Approximate memory held by obj and everything it references
+
+    Objects shared with other structures (e.g. condition texts shared with the
+    model's response table) are counted in full, so this is an upper bound.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def snapshot_session(session: Dict[str, Any], retries: int = 5) -> Dict[str, Any]:
+    """
+    Copy a live session so it can be measured or dumped while requests keep writing to it
+
+    A concurrent chat turn can append to the message deque or swap the context
+    mid-copy, which raises RuntimeError; the copy is retried until it succeeds.
+    """
+    for attempt in range(retries):
+        try:
+            snapshot = dict(session)
+            snapshot['messages'] = list(snapshot.get('messages', ()))
+            snapshot['context'] = copy.deepcopy(snapshot.get('context', {}))
+            return snapshot
+        except RuntimeError:
+            if attempt == retries - 1:
+                raise
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of a sorted list
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Min, mean, percentiles and max of values
+    """
+    values = sorted(values)
+    return {
+        'min': values[0] if values else 0,
+        'mean': sum(values) / len(values) if values else 0,
+        'p50': percentile(values, 0.5),
+        'p95': percentile(values, 0.95),
+        'max': values[-1] if values else 0
+    }
+
+
+def collect_session_stats(sessions: Dict[str, Dict[str, Any]], top_n: int = 10, dump: bool = False) -> Dict[str, Any]:
+    """
+    Count, age distribution, history lengths and approximate size of active sessions
+
+    Args:
+        sessions: The checker's active_sessions mapping
+        top_n: Number of heaviest sessions to list
+        dump: Include the context and message history of the heaviest sessions
+    """
+    now = datetime.utcnow()
+
+    # Snapshot so concurrent requests can keep adding and ending sessions
+    snapshot = list(sessions.items())
+
+    rows = []
+    age_buckets = {name: 0 for name, _ in AGE_BUCKETS}
+    for session_id, live_session in snapshot:
+        session = snapshot_session(live_session)
+        start_time = session.get('start_time')
+        age = (now - start_time).total_seconds() if start_time else None
+
+        if age is not None:
+            for name, bound in AGE_BUCKETS:
+                if bound is None or age < bound:
+                    age_buckets[name] += 1
+                    break
+
+        rows.append({
+            'session_id': session_id,
+            'age_seconds': age,
+            'messages': len(session.get('messages', ())),
+            'bytes': deep_sizeof(session),
+            'session': session
+        })
+
+    rows.sort(key=lambda row: row['bytes'], reverse=True)
+    heaviest = rows[:top_n]
+
+    if dump:
+        for row in heaviest:
+            row['context'] = row['session']['context']
+            row['history'] = row['session']['messages']
+    for row in rows:
+        del row['session']
+
+    return {
+        'active_sessions': len(rows),
+        'total_bytes': sum(row['bytes'] for row in rows),
+        'bytes_per_session': summarize([row['bytes'] for row in rows]),
+        'age_seconds': summarize([row['age_seconds'] for row in rows if row['age_seconds'] is not None]),
+        'age_distribution': age_buckets,
+        'message_history': summarize([row['messages'] for row in rows]),
+        'heaviest_sessions': heaviest
+    }
+
+
+def tracemalloc_breakdown(limit: int = 10) -> Dict[str, Any]:
+    """
+    Largest allocation sites by source line, if tracemalloc is tracing
+    """
+    if not tracemalloc.is_tracing():
+        return {
+            'tracing': False,
+            'message': 'Set TRACEMALLOC=1 before starting the API to enable the allocation breakdown'
+        }
+
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+
+    return {
+        'tracing': True,
+        'current_bytes': current,
+        'peak_bytes': peak,
+        'top_allocations': [
+            {'location': str(stat.traceback[0]), 'bytes': stat.size, 'count': stat.count}
+            for stat in top
+        ]
+    }
@@ -0,0 +1,82 @@
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesce concurrent calls with the same key into a single computation
+
+        Threaded callers block on a shared concurrent.futures.Future and async
+        callers await the same future, so a thread and a coroutine asking for the
+        same key also share one computation. Followers receive a deep copy of the
+        leader's result so callers can never modify each other's results.
+        """
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+
+        self.calls = 0
+        self.computations = 0
+
+    def _join(self, key: Hashable):
+        """
+        Return (future, is_leader) for key, registering a new flight if none is running
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+
+            future = Future()
+            self._inflight[key] = future
+            self.computations += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> None:
+        """
+        Run fn as the leader and publish its result or exception to the followers
+        """
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            # Later callers start a fresh computation instead of reusing this result
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Call fn, or wait for an identical in-flight call and share its result
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._finish(key, future, fn)
+            return future.result()
+        return copy.deepcopy(future.result())
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Async variant of do(); the leader runs fn in the default executor so the event loop is not blocked
+        """
+        future, leader = self._join(key)
+        if leader:
+            await asyncio.get_running_loop().run_in_executor(None, self._finish, key, future, fn)
+            return future.result()
+        return copy.deepcopy(await asyncio.wrap_future(future))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return call counters, including computations saved by coalescing
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'computations': self.computations,
+                'coalesced': self.calls - self.computations,
+                'inflight': len(self._inflight)
+            }
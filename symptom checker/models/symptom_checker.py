@@ -1,20 +1,41 @@
+import os
 import pickle
 import re
+import numpy as np
 import spacy
-import random
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from models.conversation_log import ConversationLog
+from models.symptom_matcher import SymptomMatcher
+from models.compact_vectorizer import load_vectorizer
+from models.answer_table import AnswerTable, normalize_text
+from models.single_flight import SingleFlight
+from models.anytime_forest import AnytimeForest
+from models.session_routing import make_session_id
 
 class SymptomChecker:
-    def __init__(self, model_dir='models'):
+    def __init__(self, model_dir='models', conversation_log: Optional[ConversationLog] = None, max_history: int = 20,
+                 compact_vectorizer: bool = False, use_answer_table: bool = True, node_id: Optional[str] = None,
+                 anytime_inference: bool = False, anytime_chunk_size: int = 10):
         """
         Initialize the SymptomChecker with trained models and data
+        
+        Args:
+            model_dir: Directory containing the trained models
+            conversation_log: Optional write-behind log that receives every turn
+            max_history: Number of recent messages kept in memory per session
+            compact_vectorizer: Replace the pickled TfidfVectorizer with a hashed, float32 copy
+            use_answer_table: Serve training patterns from the trainer's precomputed answer table
+            node_id: ID of this API node, encoded in session IDs for session-affinity routing
+            anytime_inference: Stop evaluating the forest once the predicted class can no longer change;
+                confidence is then the winning class's share of the trees evaluated
+            anytime_chunk_size: Trees evaluated between early-exit checks
         """
         self.nlp = spacy.load('en_core_web_sm')
         
-        # Load all saved components
-        with open(f'{model_dir}/vectorizer.pkl', 'rb') as f:
-            self.vectorizer = pickle.load(f)
+        # Load all saved components; compact mode uses NumPy arrays instead of a string-keyed vocabulary
+        self.vectorizer = load_vectorizer(model_dir, compact=compact_vectorizer)
             
         with open(f'{model_dir}/classifier.pkl', 'rb') as f:
             self.classifier = pickle.load(f)
@@ -34,11 +55,37 @@ class SymptomChecker:
         with open(f'{model_dir}/required_entities.pkl', 'rb') as f:
             self.required_entities = pickle.load(f)
         
+        # Precomputed results for training patterns (absent for models trained before it existed)
+        self.answer_table = None
+        if use_answer_table and os.path.exists(f'{model_dir}/answer_table.pkl'):
+            self.answer_table = AnswerTable.load(f'{model_dir}/answer_table.pkl')
+        
         # Define conversation intents that should not be treated as medical conditions
         self.conversation_intents = ['greeting', 'goodbye', 'Thanks', 'joke', 'who', 'work']
         
+        # Chunked forest evaluation that stops once the predicted class is settled
+        self.anytime_forest = AnytimeForest(self.classifier, chunk_size=anytime_chunk_size) if anytime_inference else None
+        
+        # Known symptom vocabulary and typo-tolerant index, built once at load time
+        self.symptom_vocabulary = sorted({
+            symptom
+            for condition, symptom_list in self.entities.items()
+            if condition not in self.conversation_intents
+            for symptom in symptom_list
+        })
+        self.symptom_matcher = SymptomMatcher(self.symptom_vocabulary, stop_words=self.nlp.Defaults.stop_words)
+        
         # Active sessions storage
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
+        
+        # Durable conversation history lives in the log; memory only keeps a short tail
+        self.conversation_log = conversation_log
+        self.max_history = max_history
+        
+        self.node_id = node_id
+        
+        # Identical concurrent messages share one prediction
+        self.single_flight = SingleFlight()
     
     def preprocess_text(self, text: str) -> str:
         """
@@ -59,27 +106,19 @@ class SymptomChecker:
         # Split by comma and clean
         symptoms = [s.strip().lower() for s in text.split(',') if s.strip()]
         
-        # For each entity in our known symptoms, check if it's in the text
-        all_symptoms = []
-        for condition, symptom_list in self.entities.items():
-            # Skip conversation intents
-            if condition in self.conversation_intents:
-                continue
-            all_symptoms.extend(symptom_list)
-        
-        # Remove duplicates
-        all_symptoms = list(set(all_symptoms))
-        
-        # Find matching symptoms
-        matches = []
-        for symptom in all_symptoms:
-            if symptom.lower() in text.lower():
-                matches.append(symptom)
+        # Find known symptoms that appear verbatim in the text
+        text_lower = text.lower()
+        matches = [symptom for symptom in self.symptom_vocabulary if symptom.lower() in text_lower]
         
         # If we found direct matches, use them
         if matches:
             return matches
         
+        # Fall back to approximate matching to tolerate misspellings
+        matches = self.symptom_matcher.match(text)
+        if matches:
+            return matches
+        
         # Otherwise return the split symptoms
         return symptoms
     
@@ -87,17 +126,36 @@ class SymptomChecker:
         """
         Check if the text matches a conversation intent rather than a medical symptom
         """
+        return self._conversation_check(text)[0]
+    
+    def _conversation_check(self, text: str) -> Tuple[Dict[str, Any], np.ndarray]:
+        """
+        Run the conversation check, also returning the class probabilities for reuse
+        
+        With anytime inference the forest stops once the leading class can no longer
+        be overtaken, so the predicted class matches a full evaluation. The returned
+        probabilities are then the mean over the trees evaluated rather than the
+        whole forest, and confidence values derived from them are that estimate.
+        
+        Returns:
+            tuple: (check result, class probabilities)
+        """
         # Preprocess input text
         processed_text = self.preprocess_text(text)
         
         # Vectorize text
         X = self.vectorizer.transform([processed_text])
         
-        # Predict intent with probabilities
-        probas = self.classifier.predict_proba(X)[0]
+        if self.anytime_forest is not None:
+            probas, evaluated = self.anytime_forest.predict_proba(X, self._argmax_decided)
+            if evaluated < self.anytime_forest.n_trees:
+                probas = probas / evaluated
+        else:
+            # Predict intent with probabilities
+            probas = self.classifier.predict_proba(X)[0]
         
-        # Get intent class index
-        intent_idx = self.classifier.predict(X)[0]
+        # Get intent class index; the same argmax RandomForestClassifier.predict takes
+        intent_idx = self.classifier.classes_[np.argmax(probas)]
         intent = self.label_encoder.inverse_transform([intent_idx])[0]
         
         # Check if it's a conversation intent
@@ -110,31 +168,57 @@ class SymptomChecker:
                 'intent': intent,
                 'confidence': confidence,
                 'response': response
-            }
+            }, probas
         
-        return {'is_conversation': False}
+        return {'is_conversation': False}, probas
+    
+    @staticmethod
+    def _argmax_decided(sums: np.ndarray, remaining: int) -> bool:
+        """
+        True once the leading class is ahead of every other class by more than the remaining trees can add
+        """
+        if len(sums) < 2:
+            return True
+        
+        # Each remaining tree adds at most 1 to any class; the margin absorbs float rounding
+        runner_up, leader = np.partition(sums, -2)[-2:]
+        return leader - runner_up > remaining + 1e-9
     
     def predict_condition(self, symptoms_text: str) -> Dict[str, Any]:
         """
         Predict potential medical condition based on symptoms
+        
+        Concurrent calls with the same normalized text wait for one computation;
+        normalize_text only folds case and repeated spaces, which the pipeline
+        ignores, so every coalesced caller gets the answer its own text would get.
+        """
+        return self.single_flight.do(normalize_text(symptoms_text), lambda: self._predict_condition(symptoms_text))
+    
+    async def predict_condition_async(self, symptoms_text: str) -> Dict[str, Any]:
+        """
+        Async variant of predict_condition for async servers; coalesces with threaded callers too
+        """
+        return await self.single_flight.do_async(normalize_text(symptoms_text), lambda: self._predict_condition(symptoms_text))
+    
+    def _predict_condition(self, symptoms_text: str) -> Dict[str, Any]:
+        """
+        Run the prediction pipeline for one message
         """
         try:
-            # First check if this is a conversation intent rather than symptoms
-            conversation_check = self.is_conversation_intent(symptoms_text)
+            # Verbatim training patterns skip spaCy and the forest entirely
+            if self.answer_table is not None:
+                cached = self.answer_table.lookup(symptoms_text)
+                if cached is not None:
+                    return cached
+            
+            # First check if this is a conversation intent rather than symptoms; its
+            # spaCy pass, features and forest evaluation are reused for the prediction
+            conversation_check, probas = self._conversation_check(symptoms_text)
             if conversation_check['is_conversation']:
                 return conversation_check
             
-            # Preprocess input text
-            processed_text = self.preprocess_text(symptoms_text)
-            
-            # Vectorize text
-            X = self.vectorizer.transform([processed_text])
-            
-            # Predict condition with probabilities
-            probas = self.classifier.predict_proba(X)[0]
-            
             # Get condition class index
-            condition_idx = self.classifier.predict(X)[0]
+            condition_idx = self.classifier.classes_[np.argmax(probas)]
             condition = self.label_encoder.inverse_transform([condition_idx])[0]
             
             # If the predicted condition is a conversation intent but confidence is low,
@@ -306,13 +390,13 @@ class SymptomChecker:
         """
         try:
             # Generate session ID
-            session_id = f"session_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{random.randint(1000, 9999)}"
+            session_id = make_session_id(self.node_id)
             
             # Store session info in memory
             self.active_sessions[session_id] = {
                 'start_time': datetime.utcnow(),
                 'context': {},
-                'messages': []
+                'messages': deque(maxlen=self.max_history)
             }
             
             return {
@@ -339,12 +423,18 @@ class SymptomChecker:
             # Get response based on symptoms
             response = self.get_response(message, session_id)
             
-            # Save message to session history
-            self.active_sessions[session_id]['messages'].append({
+            # Save message to session history; the condition text and precautions are
+            # the same on every turn and can be looked up from the model artifacts
+            entry = {
                 'user': message,
-                'response': response,
+                'response': self._compact_response(response),
                 'timestamp': datetime.utcnow()
-            })
+            }
+            self.active_sessions[session_id]['messages'].append(entry)
+            
+            # Hand the turn to the background writer; this only enqueues
+            if self.conversation_log is not None:
+                self.conversation_log.append({'session_id': session_id, **entry})
             
             return response
             
@@ -354,6 +444,16 @@ class SymptomChecker:
                 'message': f'Error processing message: {str(e)}'
             }
     
+    @staticmethod
+    def _compact_response(response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keep only the per-turn outcome of a response for the history and the conversation log
+        """
+        compact = {key: response[key] for key in ('status', 'condition', 'intent', 'missing_symptoms') if key in response}
+        if 'confidence' in response:
+            compact['confidence'] = float(response['confidence'])
+        return compact
+    
     def end_session(self, session_id: str) -> Dict[str, Any]:
         """
         End a symptom checker session
@@ -384,4 +484,47 @@ class SymptomChecker:
             return {
                 'status': 'error',
                 'message': f'Error ending session: {str(e)}'
-            }
\ No newline at end of file
+            }
+    
+    def export_sessions(self, session_ids: Optional[List[str]] = None, remove: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Serialize sessions so another node can take them over
+        
+        Args:
+            session_ids: Sessions to export (default: all active sessions)
+            remove: Drop the exported sessions from this node
+        """
+        if session_ids is None:
+            session_ids = list(self.active_sessions.keys())
+        
+        exported = {}
+        for session_id in session_ids:
+            session = self.active_sessions.pop(session_id, None) if remove else self.active_sessions.get(session_id)
+            if session is None:
+                continue
+            
+            start_time = session.get('start_time')
+            exported[session_id] = {
+                'start_time': start_time.isoformat() if start_time else None,
+                'context': session.get('context', {}),
+                'messages': list(session.get('messages', ()))
+            }
+        
+        return exported
+    
+    def import_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Restore sessions exported by another node
+        
+        Returns:
+            int: Number of sessions imported
+        """
+        for session_id, session in sessions.items():
+            start_time = session.get('start_time')
+            self.active_sessions[session_id] = {
+                'start_time': datetime.fromisoformat(start_time) if start_time else datetime.utcnow(),
+                'context': session.get('context', {}),
+                'messages': deque(session.get('messages', []), maxlen=self.max_history)
+            }
+        
+        return len(sessions)
@@ -0,0 +1,154 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Levenshtein distance between a and b, or None once it is known to exceed max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+
+        # Every path through this row already costs more than we allow
+        if min(current) > max_distance:
+            return None
+        previous = current
+
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Character trigrams of text, padded so word boundaries are represented
+    """
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomMatcher:
+    def __init__(self, vocabulary: List[str], max_words: int = 4, max_candidates: int = 8, max_posting: int = 256,
+                 stop_words: Iterable[str] = ()):
+        """
+        Approximate symptom matcher backed by a character-trigram inverted index
+
+        Args:
+            vocabulary: Known symptom phrases (e.g. values from entities.pkl)
+            max_words: Longest phrase, in words, that is indexed for fuzzy lookup
+            max_candidates: Candidates verified with edit distance per input window
+            max_posting: Trigrams shared by more terms than this are too common to
+                select candidates and are skipped, which bounds lookup cost as the
+                vocabulary grows
+            stop_words: Common words (e.g. spaCy's stop list) that never start or end a
+                fuzzy match, so correctly spelled text such as 'never' is not read as
+                'fever'; words that start or end a known symptom are kept
+        """
+        self.max_words = max_words
+        self.max_candidates = max_candidates
+        self.max_posting = max_posting
+
+        # Phrases are matched against input windows with the same number of words
+        self.terms: List[str] = []
+        self.normalized: List[str] = []
+        self.index: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+
+        for term in sorted(set(vocabulary)):
+            words = self.tokenize(term)
+            if not words or len(words) > max_words:
+                continue
+
+            term_id = len(self.terms)
+            normalized = ' '.join(words)
+            self.terms.append(term)
+            self.normalized.append(normalized)
+
+            for gram in trigrams(normalized):
+                self.index[len(words)][gram].append(term_id)
+
+        # Freeze the nested defaultdicts so lookups never insert keys
+        self.index = {k: dict(v) for k, v in self.index.items()}
+
+        edge_words = {word for term in self.normalized for word in (term.split()[0], term.split()[-1])}
+        self.stop_words = frozenset(word.lower() for word in stop_words) - edge_words
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        Lowercase word tokens without punctuation
+        """
+        return re.findall(r'\w+', text.lower())
+
+    @staticmethod
+    def max_distance(text: str) -> int:
+        """
+        Edit budget allowed for a phrase of this length; short words must match exactly
+        """
+        length = len(text.replace(' ', ''))
+        if length <= 4:
+            return 0
+        if length <= 8:
+            return 1
+        return 2
+
+    def lookup(self, phrase: str, n_words: int) -> Optional[Tuple[str, int]]:
+        """
+        Find the closest known symptom for a phrase of n_words words
+
+        Returns:
+            tuple: (known symptom, edit distance), or None if nothing is within budget
+        """
+        postings = self.index.get(n_words)
+        if not postings:
+            return None
+
+        # Count shared trigrams per term and keep only the strongest candidates
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in trigrams(phrase):
+            posting = postings.get(gram, ())
+            if len(posting) > self.max_posting:
+                continue
+            for term_id in posting:
+                overlap[term_id] += 1
+
+        candidates = sorted(overlap.items(), key=lambda x: x[1], reverse=True)[:self.max_candidates]
+
+        best = None
+        for term_id, _ in candidates:
+            # The edit budget follows the known term so longer symptoms tolerate more typos
+            budget = self.max_distance(self.normalized[term_id])
+            distance = bounded_edit_distance(phrase, self.normalized[term_id], budget)
+            if distance is not None and (best is None or distance < best[1]):
+                best = (self.terms[term_id], distance)
+                if distance == 0:
+                    break
+
+        return best
+
+    def match(self, text: str) -> List[str]:
+        """
+        Return known symptoms that approximately appear in text
+        """
+        words = self.tokenize(text)
+        matches = []
+
+        for n_words in sorted(self.index, reverse=True):
+            for start in range(len(words) - n_words + 1):
+                window = words[start:start + n_words]
+                if window[0] in self.stop_words or window[-1] in self.stop_words:
+                    continue
+
+                result = self.lookup(' '.join(window), n_words)
+                if result is not None and result[0] not in matches:
+                    matches.append(result[0])
+
+        return matches
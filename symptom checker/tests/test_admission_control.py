@@ -0,0 +1,124 @@
+from models.admission_control import AdmissionController
+
+
+class FakeClock:
+    """
+    Time source advanced by hand
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_controller(**kwargs):
+    clock = FakeClock()
+    return AdmissionController(clock=clock, **kwargs), clock
+
+
+def test_burst_then_rate_limited():
+    controller, clock = make_controller(rate=2.0, burst=3, max_inflight=0)
+
+    assert [controller.admit('a') for _ in range(3)] == [None, None, None]
+    rejection = controller.admit('a')
+
+    assert rejection['status_code'] == 429
+    assert controller.stats()['shed_rate_limited'] == 1
+
+
+def test_bucket_refills_with_time():
+    controller, clock = make_controller(rate=2.0, burst=3, max_inflight=0)
+    for _ in range(3):
+        controller.admit('a')
+
+    clock.now += 0.5
+    assert controller.admit('a') is None
+    assert controller.admit('a')['status_code'] == 429
+
+    # Refill is capped at the burst size
+    clock.now += 60
+    assert [controller.admit('a') for _ in range(3)] == [None, None, None]
+    assert controller.admit('a')['status_code'] == 429
+
+
+def test_buckets_are_per_client():
+    controller, clock = make_controller(rate=1.0, burst=1, max_inflight=0)
+
+    assert controller.admit('a') is None
+    assert controller.admit('a')['status_code'] == 429
+    assert controller.admit('b') is None
+
+
+def test_retry_after_rounds_up_to_whole_seconds():
+    controller, clock = make_controller(rate=0.25, burst=1, max_inflight=0)
+    controller.admit('a')
+
+    assert controller.admit('a')['retry_after'] == 4
+
+    clock.now += 2.5
+    assert controller.admit('a')['retry_after'] == 2
+
+    # Fast refill still asks the client to wait at least one second
+    controller, clock = make_controller(rate=100.0, burst=1, max_inflight=0)
+    controller.admit('a')
+    assert controller.admit('a')['retry_after'] == 1
+
+
+def test_overload_rejects_with_503():
+    controller, clock = make_controller(rate=0, burst=10, max_inflight=2)
+
+    assert controller.admit('a') is None
+    assert controller.admit('b') is None
+    rejection = controller.admit('c')
+
+    assert rejection['status_code'] == 503
+    assert rejection['retry_after'] == 1
+    assert controller.stats()['shed_overloaded'] == 1
+
+
+def test_overload_does_not_spend_a_token():
+    controller, clock = make_controller(rate=0.001, burst=1, max_inflight=1)
+
+    assert controller.admit('a') is None
+    assert controller.admit('b')['status_code'] == 503
+
+    controller.release()
+    assert controller.admit('b') is None
+
+
+def test_release_accounting():
+    controller, clock = make_controller(rate=0, burst=10, max_inflight=2)
+    controller.admit('a')
+    controller.admit('a')
+    assert controller.stats()['inflight'] == 2
+
+    controller.release()
+    assert controller.stats()['inflight'] == 1
+    assert controller.admit('a') is None
+
+    for _ in range(5):
+        controller.release()
+    stats = controller.stats()
+    assert stats['inflight'] == 0
+    assert stats['peak_inflight'] == 2
+    assert stats['admitted'] == 3
+
+
+def test_zero_burst_disables_rate_limiting():
+    controller, clock = make_controller(rate=5.0, burst=0, max_inflight=0)
+
+    assert all(controller.admit('a') is None for _ in range(50))
+    assert controller.stats()['shed_rate_limited'] == 0
+
+
+def test_least_recently_seen_client_is_evicted():
+    controller, clock = make_controller(rate=1.0, burst=1, max_inflight=0, max_clients=2)
+    controller.admit('a')
+    controller.admit('b')
+    controller.admit('c')
+
+    assert controller.stats()['tracked_clients'] == 2
+    # 'a' was evicted, so it starts again with a full bucket
+    assert controller.admit('a') is None
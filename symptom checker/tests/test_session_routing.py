@@ -0,0 +1,132 @@
+import urllib.error
+from typing import Any, Dict, Optional
+from models.session_routing import SessionRouter, make_session_id
+
+
+class FakeCluster:
+    """
+    In-memory nodes answering the session endpoints SessionRouter calls
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.down = set()
+
+    def add(self, node: str) -> str:
+        self.sessions.setdefault(node, {})
+        return f'http://{node}'
+
+    def transport(self, url: str, payload: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        node, path = url[len('http://'):].split('/', 1)
+        if node in self.down:
+            raise urllib.error.URLError('connection refused')
+        sessions = self.sessions[node]
+        payload = payload or {}
+
+        if path == 'api/start_session':
+            session_id = make_session_id(node)
+            while session_id in sessions:
+                session_id = make_session_id(node)
+            sessions[session_id] = {'messages': []}
+            return {'status': 'success', 'session_id': session_id}
+        if path == 'api/chat':
+            session = sessions.get(payload['session_id'])
+            if session is None:
+                return {'status': 'error', 'message': 'No active session found'}
+            session['messages'].append(payload['message'])
+            return {'status': 'success', 'node': node}
+        if path == 'api/end_session':
+            return {'status': 'success' if sessions.pop(payload['session_id'], None) else 'error'}
+        if path == 'api/admin/sessions/export':
+            session_ids = payload.get('session_ids', list(sessions))
+            pick = sessions.pop if payload.get('remove') else sessions.get
+            exported = {session_id: pick(session_id, None) for session_id in session_ids}
+            return {'status': 'success', 'sessions': {k: v for k, v in exported.items() if v is not None}}
+        if path == 'api/admin/sessions/import':
+            sessions.update(payload['sessions'])
+            return {'status': 'success', 'imported': len(payload['sessions'])}
+        raise AssertionError(f'unexpected path {path}')
+
+
+def make_router(nodes=('node1', 'node2', 'node3')):
+    cluster = FakeCluster()
+    router = SessionRouter({node: cluster.add(node) for node in nodes}, transport=cluster.transport, replicas=20)
+    session_ids = [router.start_session()['session_id'] for _ in range(200)]
+    return cluster, router, session_ids
+
+
+def assert_all_reachable(router, session_ids):
+    for session_id in session_ids:
+        assert router.chat(session_id, 'headache')['status'] == 'success', session_id
+
+
+def test_leave_migrates_sessions():
+    cluster, router, session_ids = make_router()
+
+    moved = router.remove_node('node2')
+
+    assert sum(moved.values()) == sum(1 for session_id in session_ids if session_id.endswith('_node2'))
+    assert 'node2' not in moved
+    assert_all_reachable(router, session_ids)
+
+
+def test_leave_then_new_node_join():
+    cluster, router, session_ids = make_router()
+    router.remove_node('node2')
+
+    # The new node takes over part of the ring, including some migrated sessions
+    moved = router.add_node('node4', cluster.add('node4'))
+
+    assert moved.get('node4', 0) > 0
+    assert_all_reachable(router, session_ids)
+
+
+def test_leave_then_same_node_rejoins():
+    cluster, router, session_ids = make_router()
+    router.remove_node('node2')
+
+    # node2's sessions route to it again by their encoded owner, so they move back
+    moved = router.add_node('node2', cluster.add('node2'))
+
+    assert moved == {'node2': sum(1 for session_id in session_ids if session_id.endswith('_node2'))}
+    assert not router.relocated
+    assert_all_reachable(router, session_ids)
+
+
+def test_chat_history_survives_leave_and_rejoin():
+    cluster, router, session_ids = make_router()
+    session_id = next(session_id for session_id in session_ids if session_id.endswith('_node2'))
+    router.chat(session_id, 'fever')
+
+    router.remove_node('node2')
+    router.chat(session_id, 'cough')
+    router.add_node('node2', cluster.add('node2'))
+    router.chat(session_id, 'rash')
+
+    assert cluster.sessions['node2'][session_id]['messages'] == ['fever', 'cough', 'rash']
+
+
+def test_end_session_forgets_relocation():
+    cluster, router, session_ids = make_router()
+    router.remove_node('node2')
+    session_id = next(iter(router.relocated))
+
+    assert router.end_session(session_id)['status'] == 'success'
+    assert session_id not in router.relocated
+
+
+def test_remove_unreachable_node():
+    cluster, router, session_ids = make_router()
+    router.remove_node('node2')
+    cluster.down.add('node3')
+
+    assert router.remove_node('node3') == {}
+    assert 'node3' not in router.urls
+    assert all(holder != 'node3' for holder in router.relocated.values())
+
+    # Everything not held by the dead node is still reachable, and nothing routes to it
+    survivors = [session_id for session_id in session_ids if session_id in cluster.sessions['node1']]
+    assert survivors
+    assert_all_reachable(router, survivors)
+    assert all(router.node_for_session(session_id) == 'node1' for session_id in session_ids)
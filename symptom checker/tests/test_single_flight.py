@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+import pytest
+from models.answer_table import normalize_text
+from models.single_flight import SingleFlight
+
+
+def wait_for_calls(flight: SingleFlight, calls: int, timeout: float = 5.0) -> None:
+    """
+    Block until flight has registered the given number of calls
+    """
+    deadline = time.monotonic() + timeout
+    while flight.stats()['calls'] < calls:
+        assert time.monotonic() < deadline, 'callers never joined'
+        time.sleep(0.001)
+
+
+def run_leader_and_follower(flight: SingleFlight, fn):
+    """
+    Start a leader running fn, join a follower while it is in flight, then let fn finish
+
+    Returns:
+        tuple: (leader outcome, follower outcome), each ('result', value) or ('error', exception)
+    """
+    release = threading.Event()
+    outcomes = {}
+
+    def leader_fn():
+        release.wait(5)
+        return fn()
+
+    def call(name, leader):
+        try:
+            value = flight.do('key', leader_fn if leader else lambda: pytest.fail('follower computed'))
+            outcomes[name] = ('result', value)
+        except Exception as e:
+            outcomes[name] = ('error', e)
+
+    leader = threading.Thread(target=call, args=('leader', True))
+    leader.start()
+    wait_for_calls(flight, 1)
+
+    follower = threading.Thread(target=call, args=('follower', False))
+    follower.start()
+    wait_for_calls(flight, 2)
+
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    return outcomes['leader'], outcomes['follower']
+
+
+def test_follower_gets_a_copy():
+    flight = SingleFlight()
+    result = {'condition': 'Flu', 'symptoms': ['fever', 'cough']}
+
+    (kind, leader_value), (_, follower_value) = run_leader_and_follower(flight, lambda: result)
+
+    assert kind == 'result'
+    assert leader_value is result
+    assert follower_value == result
+    assert follower_value is not result
+    assert follower_value['symptoms'] is not result['symptoms']
+    assert flight.stats() == {'calls': 2, 'computations': 1, 'coalesced': 1, 'inflight': 0}
+
+
+def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('model failed')
+
+    leader, follower = run_leader_and_follower(flight, fail)
+
+    assert leader[0] == 'error' and isinstance(leader[1], ValueError)
+    assert follower[0] == 'error' and isinstance(follower[1], ValueError)
+
+
+def test_key_is_removed_after_success_and_failure():
+    flight = SingleFlight()
+
+    assert flight.do('key', lambda: 1) == 1
+    assert flight.stats()['inflight'] == 0
+
+    def fail():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        flight.do('key', fail)
+    assert flight.stats()['inflight'] == 0
+
+    # A later call computes again instead of reusing the earlier result or error
+    assert flight.do('key', lambda: 2) == 2
+    assert flight.stats()['computations'] == 3
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+
+    assert flight.do('a', lambda: 'a') == 'a'
+    assert flight.do('b', lambda: 'b') == 'b'
+    assert flight.stats()['coalesced'] == 0
+
+
+def test_async_caller_joins_threaded_leader():
+    flight = SingleFlight()
+    release = threading.Event()
+    results = {}
+
+    def leader():
+        results['leader'] = flight.do('key', lambda: release.wait(5) and {'value': 1})
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    wait_for_calls(flight, 1)
+
+    async def follower():
+        task = asyncio.ensure_future(flight.do_async('key', lambda: pytest.fail('follower computed')))
+        while flight.stats()['calls'] < 2:
+            await asyncio.sleep(0.001)
+        release.set()
+        return await task
+
+    results['follower'] = asyncio.run(follower())
+    thread.join(5)
+
+    assert results['follower'] == results['leader'] == {'value': 1}
+    assert results['follower'] is not results['leader']
+
+
+def test_prediction_key_keeps_inputs_the_pipeline_treats_differently_apart():
+    # preprocess_text turns 'cough,fever' into one token and 'cough, fever' into two
+    assert normalize_text('cough,fever') != normalize_text('cough, fever')
+    # extract_symptoms only splits on a lowercase ' and '
+    assert normalize_text('cough And fever') != normalize_text('cough and fever')
+    assert normalize_text('Cough,  Fever') == normalize_text('cough, fever')
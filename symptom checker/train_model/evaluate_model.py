@@ -0,0 +1,266 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+from train_model import SymptomCheckerTrainer
+
+
+def load_preprocessed_corpus(data_path: str, cache_dir: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Load training patterns and their lemmatized text, reusing a cached copy when the data is unchanged
+
+    Args:
+        data_path: Path to the intents JSON file
+        cache_dir: Directory holding preprocessed corpora keyed by data hash
+
+    Returns:
+        tuple: (raw pattern texts, preprocessed pattern texts, condition labels)
+    """
+    with open(data_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    cache_path = os.path.join(cache_dir, f'corpus_v2_{digest}.pkl')
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+
+    # spaCy preprocessing is the expensive step, so run it once for all folds
+    trainer = SymptomCheckerTrainer(data_path=data_path, model_dir=cache_dir)
+    symptom_data = trainer.load_data()
+    raw_text = [pattern for item in symptom_data for pattern in item['patterns']]
+    X_text, y_labels, _, _ = trainer.prepare_training_data(symptom_data)
+
+    with open(cache_path, 'wb') as f:
+        pickle.dump((raw_text, X_text, y_labels), f)
+
+    return raw_text, X_text, y_labels
+
+
+# Trainer used only for its spaCy preprocessing when timing requests
+_trainer = None
+
+
+def init_trainer(data_path: str, cache_dir: str) -> None:
+    """
+    Load spaCy once for request timing
+    """
+    global _trainer
+    _trainer = SymptomCheckerTrainer(data_path=data_path, model_dir=cache_dir)
+
+
+def time_request(vectorizer: TfidfVectorizer, classifier: RandomForestClassifier, raw_text: str) -> Tuple[float, float]:
+    """
+    Time one message through the same steps the API runs per chat turn
+
+    SymptomChecker.predict_condition preprocesses with spaCy, vectorizes and
+    calls predict_proba once, reusing the result for the conversation check.
+
+    Returns:
+        tuple: (full request seconds, seconds spent in vectorizer and forest only)
+    """
+    start = time.perf_counter()
+    processed_text = _trainer.preprocess_text(raw_text)
+
+    model_start = time.perf_counter()
+    X = vectorizer.transform([processed_text])
+    classifier.predict_proba(X)
+    end = time.perf_counter()
+
+    return end - start, end - model_start
+
+
+def evaluate_fold(X_text: List[str], y: np.ndarray, train_idx: np.ndarray, test_idx: np.ndarray,
+                  n_classes: int, top_k: int, max_features: int, n_estimators: int) -> Dict[str, Any]:
+    """
+    Train on one fold and score the held-out patterns
+
+    Returns:
+        dict: Confusion counts, top-k hit counts and the fitted fold model for latency timing
+    """
+    vectorizer = TfidfVectorizer(max_features=max_features)
+    X_train = vectorizer.fit_transform([X_text[i] for i in train_idx])
+
+    classifier = RandomForestClassifier(n_estimators=n_estimators, random_state=42)
+    classifier.fit(X_train, y[train_idx])
+
+    confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+    top_k_hits = np.zeros(top_k, dtype=np.int64)
+
+    for i in test_idx:
+        probas = classifier.predict_proba(vectorizer.transform([X_text[i]]))[0]
+
+        # predict_proba columns only cover classes seen in this fold's training split
+        ranked = classifier.classes_[np.argsort(probas)[::-1]]
+        confusion[y[i], ranked[0]] += 1
+
+        hits = np.nonzero(ranked[:top_k] == y[i])[0]
+        if len(hits):
+            top_k_hits[hits[0]:] += 1
+
+    return {
+        'confusion': confusion,
+        'top_k_hits': top_k_hits,
+        'vectorizer': vectorizer,
+        'classifier': classifier,
+        'test_idx': test_idx,
+        'n_test': len(test_idx)
+    }
+
+
+def time_folds(results: List[Dict[str, Any]], raw_text: List[str]) -> Tuple[List[float], List[float]]:
+    """
+    Time every held-out request serially, after training, so other folds do not compete for the CPU
+
+    Returns:
+        tuple: (full request latencies, vectorizer and forest latencies)
+    """
+    latencies = []
+    model_latencies = []
+    for result in results:
+        for i in result['test_idx']:
+            request_seconds, model_seconds = time_request(result['vectorizer'], result['classifier'], raw_text[i])
+            latencies.append(request_seconds)
+            model_latencies.append(model_seconds)
+    return latencies, model_latencies
+
+
+def summarize_latency(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies in milliseconds
+    """
+    ms = np.asarray(latencies) * 1000.0
+    return {
+        'count': int(len(ms)),
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max())
+    }
+
+
+def cross_validate(data_path: str, folds: int = 5, workers: int = 0, top_k: int = 3,
+                   max_features: int = 1000, n_estimators: int = 100, cache_dir: str = '.cache') -> Dict[str, Any]:
+    """
+    Run k-fold cross-validation over the intents file, training folds across a process pool
+    and then timing the held-out requests serially in this process
+
+    Returns:
+        dict: JSON-serializable evaluation report
+    """
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    raw_text, X_text, y_labels = load_preprocessed_corpus(data_path, cache_dir)
+
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(y_labels)
+    n_classes = len(label_encoder.classes_)
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    splits = list(splitter.split(X_text, y))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or None) as executor:
+        futures = [
+            executor.submit(evaluate_fold, X_text, y, train_idx, test_idx, n_classes, top_k, max_features, n_estimators)
+            for train_idx, test_idx in splits
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    # Latency feeds the release gate, so it must not depend on --workers or the core count
+    init_trainer(data_path, cache_dir)
+    latencies, model_latencies = time_folds(results, raw_text)
+
+    confusion = sum(r['confusion'] for r in results)
+    top_k_hits = sum(r['top_k_hits'] for r in results)
+    total = sum(r['n_test'] for r in results)
+
+    # Per-condition confusion rows, keeping only non-zero cells to stay readable
+    conditions = list(label_encoder.classes_)
+    per_condition = {}
+    for i, condition in enumerate(conditions):
+        row = confusion[i]
+        support = int(row.sum())
+        predicted = int(confusion[:, i].sum())
+        correct = int(row[i])
+        per_condition[condition] = {
+            'support': support,
+            'correct': correct,
+            'recall': correct / support if support else 0.0,
+            'precision': correct / predicted if predicted else 0.0,
+            'predicted_as': {conditions[j]: int(row[j]) for j in np.nonzero(row)[0]}
+        }
+
+    return {
+        'data_path': data_path,
+        'folds': folds,
+        'samples': total,
+        'classes': n_classes,
+        'params': {'max_features': max_features, 'n_estimators': n_estimators},
+        'accuracy': float(top_k_hits[0] / total) if total else 0.0,
+        'top_k_accuracy': {str(k + 1): float(top_k_hits[k] / total) if total else 0.0 for k in range(top_k)},
+        'latency': summarize_latency(latencies),
+        'model_latency': summarize_latency(model_latencies),
+        'confusion_matrix': per_condition,
+        'elapsed_seconds': elapsed
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Command-line entry point; exits non-zero when a release gate is not met
+    """
+    parser = argparse.ArgumentParser(description='Cross-validated evaluation of the symptom checker model')
+    parser.add_argument('--data', default='../data/symptom_intents.json', help='Path to the intents JSON file')
+    parser.add_argument('--folds', type=int, default=5, help='Number of cross-validation folds')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: one per core)')
+    parser.add_argument('--top-k', type=int, default=3, help='Report top-1 to top-k accuracy')
+    parser.add_argument('--max-features', type=int, default=1000, help='TF-IDF vocabulary size')
+    parser.add_argument('--n-estimators', type=int, default=100, help='Number of trees in the forest')
+    parser.add_argument('--cache-dir', default='.cache', help='Directory for the preprocessed corpus cache')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--min-accuracy', type=float, help='Fail if top-1 accuracy is below this value')
+    parser.add_argument('--max-p95-ms', type=float, help='Fail if p95 per-request latency (spaCy, vectorizer and forest) exceeds this value')
+    args = parser.parse_args(argv)
+
+    report = cross_validate(
+        args.data,
+        folds=args.folds,
+        workers=args.workers,
+        top_k=args.top_k,
+        max_features=args.max_features,
+        n_estimators=args.n_estimators,
+        cache_dir=args.cache_dir
+    )
+
+    failures = []
+    if args.min_accuracy is not None and report['accuracy'] < args.min_accuracy:
+        failures.append(f"accuracy {report['accuracy']:.3f} < {args.min_accuracy}")
+    if args.max_p95_ms is not None and report['latency']['p95_ms'] > args.max_p95_ms:
+        failures.append(f"p95 latency {report['latency']['p95_ms']:.2f}ms > {args.max_p95_ms}ms")
+    report['gate'] = {'passed': not failures, 'failures': failures}
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import random
+from typing import Dict, Any, List
+
+# Intents that are chit-chat rather than conditions; copied through unchanged
+CONVERSATION_INTENTS = ['greeting', 'goodbye', 'Thanks', 'joke', 'who', 'work']
+
+QUALIFIERS = ['mild', 'severe', 'chronic', 'sudden', 'intermittent', 'persistent', 'recurring', 'acute']
+
+TEMPLATES = [
+    '{symptoms}',
+    'I have {symptoms}',
+    'I am experiencing {symptoms}',
+    'I have been having {symptoms} for a few days',
+    'my symptoms are {symptoms}',
+    'suffering from {symptoms}',
+    'lately I get {symptoms}'
+]
+
+
+def load_intents(path: str) -> List[Dict[str, Any]]:
+    """
+    Load the intents list from a JSON file
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data['intents'] if isinstance(data, dict) else data
+
+
+def condition_symptoms(intent: Dict[str, Any]) -> List[str]:
+    """
+    Symptoms of a condition, split from its comma-separated patterns
+    """
+    symptoms = []
+    for pattern in intent['patterns']:
+        for symptom in pattern.split(','):
+            symptom = symptom.strip()
+            if symptom and symptom not in symptoms:
+                symptoms.append(symptom)
+    return symptoms
+
+
+def join_symptoms(symptoms: List[str], rng: random.Random) -> str:
+    """
+    Join symptoms as a plain list or in prose
+    """
+    if len(symptoms) > 1 and rng.random() < 0.5:
+        return ', '.join(symptoms[:-1]) + ' and ' + symptoms[-1]
+    return ', '.join(symptoms)
+
+
+def generate(intents: List[Dict[str, Any]], scale: int, patterns_per_intent: int = 3, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate scale times as many condition intents as the source data
+
+    Each synthetic condition starts from a real one, keeps most of its symptoms,
+    borrows a few from other conditions so symptom sets overlap the way real ones
+    do, and adds qualified variants (e.g. 'severe cough') to grow the vocabulary.
+    """
+    rng = random.Random(seed)
+
+    conversation = [intent for intent in intents if intent['tag'] in CONVERSATION_INTENTS]
+    conditions = [intent for intent in intents if intent['tag'] not in CONVERSATION_INTENTS]
+    all_symptoms = sorted({s for intent in conditions for s in condition_symptoms(intent)})
+
+    synthetic = list(conversation)
+    for copy_idx in range(scale):
+        for intent in conditions:
+            base = condition_symptoms(intent)
+
+            # Keep a core of the real symptoms, then mix in shared and qualified ones
+            symptoms = rng.sample(base, max(1, int(len(base) * 0.7)))
+            symptoms += rng.sample(all_symptoms, min(2, len(all_symptoms)))
+            if copy_idx > 0:
+                symptoms += [f'{rng.choice(QUALIFIERS)} {s}' for s in rng.sample(base, min(2, len(base)))]
+            symptoms = list(dict.fromkeys(symptoms))
+
+            tag = intent['tag'] if copy_idx == 0 else f"{intent['tag']} (variant {copy_idx})"
+
+            patterns = []
+            for _ in range(patterns_per_intent):
+                chosen = rng.sample(symptoms, min(len(symptoms), rng.randint(2, 5)))
+                patterns.append(rng.choice(TEMPLATES).format(symptoms=join_symptoms(chosen, rng)))
+
+            # Comma-only first pattern so the trainer can derive required entities
+            patterns[0] = ', '.join(symptoms[:min(len(symptoms), 4)])
+
+            synthetic.append({
+                'tag': tag,
+                'patterns': patterns,
+                'responses': intent.get('responses', '') if copy_idx == 0 else f"You may have {tag}. " + intent.get('responses', ''),
+                'Precaution': intent.get('Precaution', '')
+            })
+
+    return synthetic
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate scaled-up synthetic intents files')
+    parser.add_argument('--data', default='../data/symptom_intents.json', help='Source intents file')
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100, 1000], help='Scale factors to generate')
+    parser.add_argument('--output-dir', default='../data/synthetic', help='Directory for the generated files')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    source = load_intents(args.data)
+    for scale in args.scales:
+        intents = generate(source, scale, seed=args.seed)
+        path = os.path.join(args.output_dir, f'symptom_intents_x{scale}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'intents': intents}, f)
+
+        n_patterns = sum(len(intent['patterns']) for intent in intents)
+        print(f"Wrote {len(intents)} intents and {n_patterns} patterns to {path}")
@@ -245,51 +245,7 @@ class SymptomCheckerTester:
             print("\nNOTE: This is an automated prediction and not a medical diagnosis.")
             print("Always consult with a healthcare professional for proper medical advice.")
 
-def run_batch_test(tester, test_cases):
-    """
-    Run batch testing with predefined test cases
-    
-    Args:
-        tester: SymptomCheckerTester instance
-        test_cases: Dictionary of test cases with expected conditions
-    """
-    print("\n===== BATCH TESTING =====")
-    correct = 0
-    
-    for symptoms, expected in test_cases.items():
-        predicted, confidence = tester.predict_condition(symptoms)
-        
-        result = "✓ CORRECT" if predicted == expected else "✗ WRONG"
-        if predicted == expected:
-            correct += 1
-            
-        print(f"Symptoms: '{symptoms}'")
-        print(f"Expected: {expected}, Predicted: {predicted} (Confidence: {confidence:.2f})")
-        print(f"Result: {result}\n")
-    
-    accuracy = correct / len(test_cases) if test_cases else 0
-    print(f"Test Accuracy: {accuracy:.2f} ({correct}/{len(test_cases)})")
-
 if __name__ == "__main__":
-    # Create tester instance
+    # Interactive manual testing; use evaluate_model.py for unattended accuracy and latency checks
     tester = SymptomCheckerTester()
-    
-    # Define some test cases
-    test_cases = {
-        "I have a headache and nasal congestion": "Sinusitis",
-        "My eyes are red and itchy": "Pink Eye",
-        "I feel heartburn after eating": "Acid Reflux",
-        "It burns when I urinate": "UTI",
-        "I'm feeling dizzy and my mouth is very dry": "Dehydration",
-        "My ankle is swollen and painful": "Sprained Ankle",
-        "I've been vomiting and have stomach cramps": "Food Poisoning",
-        "I'm sweating a lot and feel weak": "Heat Exhaustion",
-        "My nose is runny and I keep sneezing": "Seasonal Allergies",
-        "My ear hurts and I can't hear well": "Ear Infection"
-    }
-    
-    # Run batch test
-    run_batch_test(tester, test_cases)
-    
-    # Run interactive test
-    tester.interactive_test()
\ No newline at end of file
+    tester.interactive_test()
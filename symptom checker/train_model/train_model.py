@@ -1,14 +1,99 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import numpy as np
 import pandas as pd
+import argparse
+import copy
+import itertools
 import json
 import re
 import pickle
 import os
+import sys
+import time
 import spacy
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+
+# The serving code lives in the sibling models package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.answer_table import AnswerTable
+from models.compact_vectorizer import CompactTfidfVectorizer
+
+def evaluate_candidate(params: Dict[str, Any], folds: List[tuple], vectorizer_bytes: int, step: int, max_estimators: int,
+                       patience: int, tolerance: float) -> Dict[str, Any]:
+    """
+    Grow forests for one candidate with warm start, scoring accuracy and size at each step
+    
+    Latency is not measured here: other candidates are training on every core, so
+    timings would depend on contention. measure_latency() runs after the pool.
+    
+    Args:
+        params: Forest parameters besides n_estimators (plus the max_features used for folds)
+        folds: Cached (X_train, y_train, X_test, y_test) TF-IDF matrices for each fold
+        vectorizer_bytes: Pickled size of the vectorizer for this max_features
+        step: Trees added per growth step
+        max_estimators: Largest forest tried
+        patience: Growth steps without an accuracy improvement before stopping
+        tolerance: Smallest accuracy gain that counts as an improvement
+    
+    Returns:
+        dict: Accuracy and size at every forest size tried, and the first fold's largest forest
+    """
+    forest_params = {k: v for k, v in params.items() if k != 'max_features'}
+    forests = [RandomForestClassifier(n_estimators=step, warm_start=True, random_state=42, **forest_params) for _ in folds]
+    
+    history = []
+    best_accuracy = None
+    stale = 0
+    
+    for n_estimators in range(step, max_estimators + 1, step):
+        accuracies = []
+        for forest, (X_train, y_train, X_test, y_test) in zip(forests, folds):
+            # warm_start keeps the existing trees and only fits the new ones
+            forest.set_params(n_estimators=n_estimators)
+            forest.fit(X_train, y_train)
+            accuracies.append(float(np.mean(forest.predict(X_test) == y_test)))
+        
+        accuracy = float(np.mean(accuracies))
+        history.append({
+            **params,
+            'n_estimators': n_estimators,
+            'accuracy': accuracy,
+            'size_mb': (len(pickle.dumps(forests[0])) + vectorizer_bytes) / 1e6
+        })
+        
+        # Stop growing once accuracy has plateaued, independent of the latency and size penalties
+        if best_accuracy is None or accuracy > best_accuracy + tolerance:
+            best_accuracy = accuracy
+            stale = 0
+        else:
+            stale += 1
+        
+        if stale >= patience:
+            break
+    
+    return {'history': history, 'forest': forests[0]}
+
+def measure_latency(forest: RandomForestClassifier, n_estimators: int, X_test: Any, rows: int = 20) -> float:
+    """
+    Mean single-message predict_proba latency in milliseconds using the first n_estimators trees
+    
+    Warm start grows trees in order, so the first n trees of the largest forest are
+    the forest the search scored at that size.
+    """
+    truncated = copy.copy(forest)
+    truncated.estimators_ = forest.estimators_[:n_estimators]
+    truncated.n_estimators = n_estimators
+    
+    # Serving predicts one message at a time, so time single-row predict_proba
+    rows = min(rows, X_test.shape[0])
+    start = time.perf_counter()
+    for i in range(rows):
+        truncated.predict_proba(X_test[i])
+    return (time.perf_counter() - start) * 1000.0 / max(rows, 1)
 
 class SymptomCheckerTrainer:
     def __init__(self, data_path: str = '../data/symptom_intents.json', model_dir: str = '../models'):
@@ -120,9 +205,16 @@ class SymptomCheckerTrainer:
         
         return entities, required_entities
     
-    def train_model(self) -> None:
+    def train_model(self, build_answer_table: bool = True, max_features: Optional[int] = 1000,
+                    n_estimators: int = 100, classifier_params: Optional[Dict[str, Any]] = None) -> None:
         """
         Train the symptom checker model
+        
+        Args:
+            build_answer_table: Also precompute the exact-match answer table; when False any existing table is deleted
+            max_features: TF-IDF vocabulary size (None keeps every term)
+            n_estimators: Number of trees in the forest
+            classifier_params: Extra RandomForestClassifier parameters, e.g. from search_hyperparameters
         """
         # Load and prepare data
         symptom_data = self.load_data()
@@ -138,7 +230,7 @@ class SymptomCheckerTrainer:
         entities, required_entities = self.extract_entities(symptom_data)
         
         # Vectorize text
-        vectorizer = TfidfVectorizer(max_features=1000)
+        vectorizer = TfidfVectorizer(max_features=max_features)
         X = vectorizer.fit_transform(X_train)
         
         # Encode labels
@@ -146,7 +238,7 @@ class SymptomCheckerTrainer:
         y = label_encoder.fit_transform(y_train)
         
         # Train classifier
-        classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        classifier = RandomForestClassifier(n_estimators=n_estimators, random_state=42, **(classifier_params or {}))
         classifier.fit(X, y)
         
         print(f"Trained classifier with {classifier.n_estimators} trees")
@@ -155,6 +247,19 @@ class SymptomCheckerTrainer:
         with open(f'{self.model_dir}/vectorizer.pkl', 'wb') as f:
             pickle.dump(vectorizer, f)
         
+        # Compact copy loaded by SymptomChecker(compact_vectorizer=True)
+        compact_path = f'{self.model_dir}/compact_vectorizer.pkl'
+        try:
+            compact = CompactTfidfVectorizer.from_tfidf(vectorizer)
+        except ValueError as e:
+            # A copy from an earlier run would no longer match vectorizer.pkl
+            if os.path.exists(compact_path):
+                os.remove(compact_path)
+            print(f"Skipped compact vectorizer: {e}")
+        else:
+            with open(compact_path, 'wb') as f:
+                pickle.dump(compact, f)
+        
         with open(f'{self.model_dir}/classifier.pkl', 'wb') as f:
             pickle.dump(classifier, f)
         
@@ -173,9 +278,124 @@ class SymptomCheckerTrainer:
         with open(f'{self.model_dir}/required_entities.pkl', 'wb') as f:
             pickle.dump(required_entities, f)
         
+        # Precompute answers for the training patterns with the serving code itself
+        # A table from the previous model would answer with stale predictions
+        if build_answer_table:
+            self.build_answer_table(symptom_data)
+        elif os.path.exists(f'{self.model_dir}/answer_table.pkl'):
+            os.remove(f'{self.model_dir}/answer_table.pkl')
+            print("Removed stale answer table")
+        
         print("Model training completed successfully!")
         print(f"All models and data saved to {self.model_dir}/")
 
+    def build_answer_table(self, symptom_data: List[Dict[str, Any]]) -> None:
+        """
+        Build the exact-match answer table from the saved model artifacts
+        """
+        from models.symptom_checker import SymptomChecker
+        
+        # Ignore any table left over from a previous training run
+        checker = SymptomChecker(model_dir=self.model_dir, use_answer_table=False)
+        patterns = [pattern for item in symptom_data for pattern in item['patterns']]
+        table = AnswerTable.build(patterns, checker.predict_condition)
+        table.save(f'{self.model_dir}/answer_table.pkl')
+        
+        print(f"Saved answer table with {len(table.entries)} entries")
+
+    def search_hyperparameters(self, max_features_grid: List[Optional[int]] = (500, 1000, 2000, None),
+                               max_depth_grid: List[Optional[int]] = (None, 30),
+                               min_samples_leaf_grid: List[int] = (1, 2),
+                               step: int = 25, max_estimators: int = 300, n_folds: int = 3,
+                               patience: int = 2, tolerance: float = 0.002,
+                               latency_weight: float = 0.01, size_weight: float = 0.005,
+                               workers: int = 0) -> Dict[str, Any]:
+        """
+        Search vectorizer and forest settings for the best accuracy/latency/size trade-off
+        
+        The corpus is lemmatized once, and TF-IDF matrices are built once per
+        max_features and fold, then shared by every forest candidate. Candidates
+        run in parallel; each grows its forests with warm start and stops early
+        when accuracy plateaus. Latency is timed afterwards, one trial at a time.
+        
+        Args:
+            max_features_grid: TF-IDF vocabulary sizes to try
+            max_depth_grid: Forest max_depth values to try
+            min_samples_leaf_grid: Forest min_samples_leaf values to try
+            step: Trees added per growth step
+            max_estimators: Largest forest tried
+            n_folds: Cross-validation folds
+            patience: Growth steps without improvement before stopping
+            tolerance: Smallest accuracy gain that counts as an improvement
+            latency_weight: Objective penalty per millisecond of single-message latency
+            size_weight: Objective penalty per megabyte of model artifacts
+            workers: Worker processes (default: one per core)
+        
+        Returns:
+            dict: The best parameters and every trial, sorted by score
+        """
+        symptom_data = self.load_data()
+        X_text, y_train, _, _ = self.prepare_training_data(symptom_data)
+        y = LabelEncoder().fit_transform(y_train)
+        
+        splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+        splits = list(splitter.split(X_text, y))
+        
+        # Feature matrices depend only on max_features and the fold, so build each once
+        fold_cache = {}
+        vectorizer_bytes = {}
+        for max_features in max_features_grid:
+            folds = []
+            for train_idx, test_idx in splits:
+                vectorizer = TfidfVectorizer(max_features=max_features)
+                X_train = vectorizer.fit_transform([X_text[i] for i in train_idx])
+                X_test = vectorizer.transform([X_text[i] for i in test_idx])
+                folds.append((X_train, y[train_idx], X_test, y[test_idx]))
+            fold_cache[max_features] = folds
+            vectorizer_bytes[max_features] = len(pickle.dumps(vectorizer))
+        
+        candidates = [
+            {'max_features': mf, 'max_depth': depth, 'min_samples_leaf': leaf}
+            for mf, depth, leaf in itertools.product(max_features_grid, max_depth_grid, min_samples_leaf_grid)
+        ]
+        print(f"Searching {len(candidates)} candidates over {n_folds} folds")
+        
+        with ProcessPoolExecutor(max_workers=workers or None) as executor:
+            futures = [
+                executor.submit(evaluate_candidate, params, fold_cache[params['max_features']],
+                                vectorizer_bytes[params['max_features']], step, max_estimators,
+                                patience, tolerance)
+                for params in candidates
+            ]
+            results = [future.result() for future in futures]
+        
+        # Time every trial serially now that no candidate is training
+        for result in results:
+            for trial in result['history']:
+                X_test = fold_cache[trial['max_features']][0][2]
+                trial['latency_ms'] = measure_latency(result['forest'], trial['n_estimators'], X_test)
+                trial['score'] = trial['accuracy'] - latency_weight * trial['latency_ms'] - size_weight * trial['size_mb']
+        
+        trials = sorted((trial for r in results for trial in r['history']), key=lambda t: t['score'], reverse=True)
+        best = trials[0]
+        
+        print(f"Best: {best}")
+        return {'best': best, 'trials': trials}
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Train the symptom checker model')
+    parser.add_argument('--search', action='store_true', help='Search hyperparameters first and train with the best')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes for the search (default: one per core)')
+    args = parser.parse_args()
+    
     trainer = SymptomCheckerTrainer()
-    trainer.train_model()
\ No newline at end of file
+    
+    if args.search:
+        best = trainer.search_hyperparameters(workers=args.workers)['best']
+        trainer.train_model(
+            max_features=best['max_features'],
+            n_estimators=best['n_estimators'],
+            classifier_params={'max_depth': best['max_depth'], 'min_samples_leaf': best['min_samples_leaf']}
+        )
+    else:
+        trainer.train_model()
\ No newline at end of file